@@ -1,25 +1,238 @@
 """
 Builds receipt_embeddings from receipts.body content.
 
-Stub implementation: requires OpenAI client and pgvector. Fill in embedding provider
-and batching strategy before running in production.
+Requires the openai SDK (>=1.0) and the pgvector extension (>=0.7, for
+halfvec storage) on Postgres.
+Receipts without an embedding are read a page at a time, embedded with one
+provider call per batch, and loaded with COPY. Text whose content_hash already
+has a stored embedding for the model is not sent to the provider again.
+Pass --no-copy to write with batched INSERT ... ON CONFLICT DO NOTHING instead
+of COPY (e.g. when other writers may insert the same receipts).
+
+Each page is claimed with FOR NO KEY UPDATE SKIP LOCKED and released on commit,
+so --workers N processes (or several hosts) embed disjoint pages in parallel.
+Idempotent: rerun to resume.
 """
 
+import argparse
+import hashlib
+import json
+import multiprocessing
 import os
 
+import psycopg
+
+DEFAULT_MODEL = "text-embedding-3-small"
+DEFAULT_BATCH_SIZE = 96
+PAGE_SIZE = 512
+
+# Token counts are approximated from character length; this keeps requests
+# under the provider's per-input and per-request token limits.
+CHARS_PER_TOKEN = 4
+MAX_INPUT_TOKENS = 8191
+MAX_REQUEST_TOKENS = 300_000
+
+SQL_SELECT_PENDING = """
+SELECT r.receipt_id, r.body
+FROM receipts r
+WHERE NOT EXISTS (
+  SELECT 1 FROM receipt_embeddings e WHERE e.receipt_id = r.receipt_id
+)
+ORDER BY r.receipt_id
+LIMIT %s
+FOR NO KEY UPDATE OF r SKIP LOCKED;
+"""
+SQL_SELECT_KNOWN = """
+SELECT DISTINCT ON (content_hash) content_hash, dims, embedding::text
+FROM receipt_embeddings
+WHERE model = %s AND content_hash = ANY(%s);
+"""
+SQL_COPY = (
+    "COPY receipt_embeddings (receipt_id, model, dims, embedding, content_hash) FROM STDIN"
+)
+SQL_INSERT = """
+INSERT INTO receipt_embeddings (receipt_id, model, dims, embedding, content_hash)
+VALUES (%s, %s, %s, %s, %s)
+ON CONFLICT (receipt_id) DO NOTHING;
+"""
+
+
+def receipt_text(body) -> str:
+    """Return the text embedded for a receipt body, truncated to the input limit."""
+    if isinstance(body, str):
+        text = body
+    else:
+        text = json.dumps(body, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return text[: MAX_INPUT_TOKENS * CHARS_PER_TOKEN]
+
+
+def content_hash(text: str) -> str:
+    digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+    return f"sha256:{digest}"
+
+
+def iter_batches(items: list[tuple[str, str]], batch_size: int):
+    """Yield (key, text) batches bounded by size and approximate tokens."""
+    batch: list[tuple[str, str]] = []
+    tokens = 0
+    for item in items:
+        item_tokens = len(item[1]) // CHARS_PER_TOKEN + 1
+        if batch and (len(batch) >= batch_size or tokens + item_tokens > MAX_REQUEST_TOKENS):
+            yield batch
+            batch = []
+            tokens = 0
+        batch.append(item)
+        tokens += item_tokens
+    if batch:
+        yield batch
+
+
+def embed_batch(client, texts: list[str], model: str = DEFAULT_MODEL) -> list[list[float]]:
+    """Embed all texts with a single provider call, preserving input order."""
+    response = client.embeddings.create(model=model, input=texts)
+    return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+
+
+def vector_literal(vector: list[float]) -> str:
+    """Format a vector in pgvector's text input format at half precision."""
+    # halfvec keeps ~3 significant digits; more only inflates the COPY stream.
+    return "[" + ",".join(format(value, ".5g") for value in vector) + "]"
+
+
+def _known_vectors(conn, model: str, hashes: list[str]) -> dict[str, tuple[int, str]]:
+    with conn.cursor() as cur:
+        cur.execute(SQL_SELECT_KNOWN, (model, hashes))
+        return {digest: (dims, vector) for digest, dims, vector in cur.fetchall()}
+
+
+def write_embeddings(conn, rows: list[tuple], use_copy: bool = True) -> None:
+    """Store embedding rows with COPY, or with one pipelined executemany."""
+    with conn.cursor() as cur:
+        if use_copy:
+            with cur.copy(SQL_COPY) as copy:
+                for row in rows:
+                    copy.write_row(row)
+        else:
+            cur.executemany(SQL_INSERT, rows)
+
+
+def embed_pending(
+    conn,
+    client,
+    model: str,
+    batch_size: int,
+    use_copy: bool = True,
+    page_size: int = PAGE_SIZE,
+) -> int:
+    """Claim and embed one page of receipts lacking embeddings; return the number stored."""
+    with conn.cursor() as cur:
+        cur.execute(SQL_SELECT_PENDING, (page_size,))
+        pending = []
+        for receipt_id, body in cur.fetchall():
+            text = receipt_text(body)
+            pending.append((receipt_id, text, content_hash(text)))
+    if not pending:
+        return 0
+
+    vectors = _known_vectors(conn, model, sorted({digest for _, _, digest in pending}))
+    missing: dict[str, str] = {}
+    for _, text, digest in pending:
+        if digest not in vectors:
+            missing.setdefault(digest, text)
+
+    for batch in iter_batches(list(missing.items()), batch_size):
+        embeddings = embed_batch(client, [text for _, text in batch], model)
+        for (digest, _), embedding in zip(batch, embeddings):
+            vectors[digest] = (len(embedding), vector_literal(embedding))
+
+    rows = []
+    for receipt_id, _, digest in pending:
+        dims, vector = vectors[digest]
+        rows.append((receipt_id, model, dims, vector, digest))
+    write_embeddings(conn, rows, use_copy=use_copy)
+    return len(pending)
+
+
+def _openai_client():
+    try:
+        from openai import OpenAI
+    except ImportError as exc:
+        raise RuntimeError("openai>=1.0 is required for the embedding job") from exc
+    return OpenAI()
+
+
+def run_worker(dsn: str, model: str, batch_size: int, page_size: int, use_copy: bool) -> None:
+    """Embed pages until no unclaimed receipts remain; commit releases each page's locks."""
+    client = _openai_client()
+    with psycopg.connect(dsn) as conn:
+        while True:
+            stored = embed_pending(
+                conn,
+                client,
+                model,
+                batch_size,
+                use_copy=use_copy,
+                page_size=page_size,
+            )
+            conn.commit()
+            if stored == 0:
+                break
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Build receipt_embeddings from receipts.")
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=DEFAULT_BATCH_SIZE,
+        help="Receipts per embedding request (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--page-size",
+        type=int,
+        default=PAGE_SIZE,
+        help="Receipts claimed per transaction; lower it with many workers (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Parallel worker processes (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--no-copy",
+        action="store_true",
+        help="Write with INSERT ... ON CONFLICT DO NOTHING instead of COPY",
+    )
+    args = parser.parse_args(argv)
+    for name in ("batch_size", "page_size", "workers"):
+        if getattr(args, name) <= 0:
+            parser.error(f"--{name.replace('_', '-')} must be positive")
 
-def main() -> None:
     dsn = os.environ.get("DATABASE_URL")
     if not dsn:
         raise RuntimeError("DATABASE_URL is required")
 
-    # TODO: Implement embedding pipeline.
-    # - Requires openai>=1.0 (or alternate provider)
-    # - Requires pgvector extension on Postgres
-    # - Define receipt text extraction + hashing strategy
-    raise NotImplementedError(
-        "Embedding job not implemented. Install provider SDK and implement batching."
-    )
+    _openai_client()
+    model = os.environ.get("RECEIPTGATE_EMBEDDING_MODEL", DEFAULT_MODEL)
+    worker_args = (dsn, model, args.batch_size, args.page_size, not args.no_copy)
+
+    if args.workers == 1:
+        run_worker(*worker_args)
+        return
+
+    context = multiprocessing.get_context("spawn")
+    workers = [
+        context.Process(target=run_worker, args=worker_args, name=f"embed-worker-{i}")
+        for i in range(args.workers)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    failed = [worker.name for worker in workers if worker.exitcode != 0]
+    if failed:
+        raise RuntimeError(f"Embedding workers failed: {', '.join(failed)}")
 
 
 if __name__ == "__main__":
@@ -1,13 +1,28 @@
 """
 Builds receipt_edges from receipts.caused_by_receipt_id.
 Idempotent: rebuildable from canon.
+
+The rebuild runs as one transaction with synchronous_commit off: a crash can
+lose the last rebuild, which is safe because the job can simply be rerun.
+
+Pass --bulk for cold rebuilds of large ledgers: the table is truncated and
+refilled with COPY fed from a server-side cursor instead of INSERT ... SELECT.
 """
 
+import argparse
 import os
+from contextlib import contextmanager
 
 import psycopg
 
 EDGE_TYPE = "caused_by"
+BULK_FETCH_SIZE = 50_000
+INDEX_REBUILD_THRESHOLD = 100_000
+
+SQL_SESSION_TUNING = (
+    "SET LOCAL synchronous_commit = off;",
+    "SET LOCAL work_mem = '256MB';",
+)
 
 SQL_CLEAR = "DELETE FROM receipt_edges WHERE edge_type = %s;"
 SQL_INSERT = """
@@ -18,15 +33,99 @@ WHERE caused_by_receipt_id IS NOT NULL
 ON CONFLICT DO NOTHING;
 """
 
+SQL_TRUNCATE = "TRUNCATE receipt_edges;"
+SQL_SELECT_EDGES = """
+SELECT receipt_id, caused_by_receipt_id
+FROM receipts
+WHERE caused_by_receipt_id IS NOT NULL
+"""
+SQL_COPY = "COPY receipt_edges (from_receipt_id, to_receipt_id, edge_type) FROM STDIN"
+
+SQL_ESTIMATE_RECEIPTS = "SELECT reltuples::bigint FROM pg_class WHERE oid = 'receipts'::regclass;"
+SQL_DROP_INDEXES = "DROP INDEX IF EXISTS idx_receipt_edges_to;"
+SQL_CREATE_INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_receipt_edges_to
+  ON receipt_edges (to_receipt_id);
+"""
+
+
+def _tune_transaction(conn) -> None:
+    with conn.cursor() as cur:
+        for statement in SQL_SESSION_TUNING:
+            cur.execute(statement)
+
+
+def _estimated_receipt_count(conn) -> int:
+    with conn.cursor() as cur:
+        cur.execute(SQL_ESTIMATE_RECEIPTS)
+        row = cur.fetchone()
+    return int(row[0]) if row and row[0] is not None else 0
+
+
+@contextmanager
+def deferred_edge_indexes(conn):
+    """
+    Drop secondary receipt_edges indexes for the load and rebuild them after.
+
+    The primary key stays in place because ON CONFLICT depends on it. DDL is
+    transactional in Postgres, so a failed load rolls the DROP back as well.
+    """
+    with conn.cursor() as cur:
+        cur.execute(SQL_DROP_INDEXES)
+    yield
+    with conn.cursor() as cur:
+        cur.execute(SQL_CREATE_INDEXES)
+
+
+def rebuild_edges(conn) -> None:
+    with conn.cursor() as cur:
+        cur.execute(SQL_CLEAR, (EDGE_TYPE,))
+        cur.execute(SQL_INSERT, (EDGE_TYPE,))
+
+
+def bulk_rebuild_edges(conn, fetch_size: int = BULK_FETCH_SIZE) -> None:
+    """
+    Truncate receipt_edges and reload it with COPY.
+
+    COPY has no ON CONFLICT clause, so this relies on the truncate leaving the
+    table empty; receipts.receipt_id is unique, so the source has no duplicates.
+    """
+    with conn.cursor() as cur:
+        cur.execute(SQL_TRUNCATE)
+
+    with conn.cursor(name="receipt_edges_source") as source, conn.cursor() as cur:
+        source.execute(SQL_SELECT_EDGES)
+        while True:
+            rows = source.fetchmany(fetch_size)
+            if not rows:
+                break
+            with cur.copy(SQL_COPY) as copy:
+                for from_receipt_id, to_receipt_id in rows:
+                    copy.write_row((from_receipt_id, to_receipt_id, EDGE_TYPE))
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Rebuild receipt_edges from receipts.")
+    parser.add_argument(
+        "--bulk",
+        action="store_true",
+        help="Truncate and reload with COPY (cold rebuilds of large ledgers)",
+    )
+    args = parser.parse_args(argv)
 
-def main() -> None:
     dsn = os.environ.get("DATABASE_URL")
     if not dsn:
         raise RuntimeError("DATABASE_URL is required")
-    with psycopg.connect(dsn) as conn:
-        with conn.cursor() as cur:
-            cur.execute(SQL_CLEAR, (EDGE_TYPE,))
-            cur.execute(SQL_INSERT, (EDGE_TYPE,))
+    rebuild = bulk_rebuild_edges if args.bulk else rebuild_edges
+    # prepare_threshold=0: parameterized statements are server-prepared on first use,
+    # so repeated rebuilds on this connection skip parse/plan.
+    with psycopg.connect(dsn, prepare_threshold=0) as conn:
+        _tune_transaction(conn)
+        if _estimated_receipt_count(conn) >= INDEX_REBUILD_THRESHOLD:
+            with deferred_edge_indexes(conn):
+                rebuild(conn)
+        else:
+            rebuild(conn)
         conn.commit()
 
 
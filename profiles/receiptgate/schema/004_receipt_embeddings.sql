@@ -1,16 +1,23 @@
 BEGIN;
 
+-- Embeddings are stored as half precision (pgvector >= 0.7), halving row and
+-- index size. Existing tables can be converted in place with:
+--   ALTER TABLE receipt_embeddings ALTER COLUMN embedding TYPE HALFVEC(1536)
 CREATE TABLE IF NOT EXISTS receipt_embeddings (
   receipt_id TEXT PRIMARY KEY REFERENCES receipts(receipt_id) ON DELETE CASCADE,
   model TEXT NOT NULL,
   dims INT NOT NULL,
-  embedding VECTOR(1536) NOT NULL,
+  embedding HALFVEC(1536) NOT NULL,
   content_hash TEXT NOT NULL,
   created_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP
 );
 
+-- Reuse lookup for identical text (content-hash dedup in the embedding job)
+CREATE INDEX IF NOT EXISTS idx_receipt_embeddings_content_hash
+  ON receipt_embeddings (model, content_hash);
+
 -- Optional vector index (pgvector)
 -- CREATE INDEX IF NOT EXISTS idx_receipt_embeddings_vec
---   ON receipt_embeddings USING ivfflat (embedding vector_l2_ops);
+--   ON receipt_embeddings USING hnsw (embedding halfvec_l2_ops);
 
 COMMIT;
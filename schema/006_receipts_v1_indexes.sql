@@ -0,0 +1,24 @@
+BEGIN;
+
+-- Open inbox rows only: list_inbox never reads archived receipts.
+CREATE INDEX IF NOT EXISTS idx_receipts_v1_inbox_open
+  ON receipts_v1 (tenant_id, recipient_ai, phase, stored_at DESC)
+  WHERE archived_at IS NULL;
+
+-- Terminal-phase probe used by list_inbox to exclude finished tasks.
+CREATE INDEX IF NOT EXISTS idx_receipts_v1_task_phase
+  ON receipts_v1 (tenant_id, task_id, phase);
+
+-- Keyset paging for search_receipts: (stored_at, receipt_id) seeks within a task.
+-- Task listings scan it in either direction, so it supersedes 005's
+-- idx_receipts_v1_task and inserts maintain one task index instead of two.
+CREATE INDEX IF NOT EXISTS idx_receipts_v1_task_keyset
+  ON receipts_v1 (tenant_id, task_id, stored_at DESC, receipt_id DESC);
+DROP INDEX IF EXISTS idx_receipts_v1_task;
+
+-- created_at is only projected (payload->>'created_at') by task listings and
+-- search, never filtered on, so it gets no expression index.
+
+ANALYZE receipts_v1;
+
+COMMIT;
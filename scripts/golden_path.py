@@ -3,17 +3,19 @@
 
 from __future__ import annotations
 
-import json
 import os
 import sys
 import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
+from types import MappingProxyType
 from typing import Any
-from urllib.error import HTTPError
-from urllib.parse import urlencode
-from urllib.request import Request, urlopen
 from uuid import uuid4
 
+import httpx
+import orjson
+
 
 def _env(name: str, default: str | None = None) -> str | None:
     value = os.environ.get(name)
@@ -23,11 +25,38 @@ def _env(name: str, default: str | None = None) -> str | None:
 
 
 class HttpClient:
-    def __init__(self, base_url: str, api_key: str | None = None) -> None:
+    def __init__(
+        self,
+        base_url: str,
+        api_key: str | None = None,
+        uds: str | None = None,
+        http2: bool = False,
+    ) -> None:
         self.base_url = base_url.rstrip("/")
         self.headers: dict[str, str] = {"Content-Type": "application/json"}
         if api_key:
             self.headers["Authorization"] = f"Bearer {api_key}"
+        # One pooled client for the whole run so keep-alive reuses the connection.
+        # uds skips TCP for a local server (uvicorn --uds); http2 needs the h2 package.
+        transport = httpx.HTTPTransport(
+            uds=uds,
+            http2=http2,
+            limits=httpx.Limits(max_connections=4, max_keepalive_connections=4),
+        )
+        self._client = httpx.Client(
+            base_url=self.base_url,
+            headers=self.headers,
+            transport=transport,
+        )
+
+    def __enter__(self) -> HttpClient:
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._client.close()
 
     def request_json(
         self,
@@ -37,30 +66,32 @@ class HttpClient:
         query: dict[str, Any] | None = None,
         timeout: float = 10.0,
     ) -> dict[str, Any]:
-        url = f"{self.base_url}{path}"
+        params = None
         if query:
-            query = {k: v for k, v in query.items() if v is not None}
-            if query:
-                url = f"{url}?{urlencode(query)}"
+            params = {k: v for k, v in query.items() if v is not None} or None
 
         data = None
         if payload is not None:
-            data = json.dumps(payload, default=str).encode("utf-8")
-
-        req = Request(url, data=data, method=method)
-        for key, value in self.headers.items():
-            req.add_header(key, value)
+            data = orjson.dumps(payload, default=str)
 
-        try:
-            with urlopen(req, timeout=timeout) as response:
-                raw = response.read()
-        except HTTPError as exc:
-            detail = exc.read().decode("utf-8", errors="replace")
-            raise RuntimeError(f"{method} {url} failed: {exc.code} {exc.reason}: {detail}") from None
+        response = self._client.request(
+            method,
+            path,
+            content=data,
+            params=params,
+            timeout=timeout,
+        )
+        raw = response.content
+        if response.status_code >= 400:
+            detail = raw.decode("utf-8", errors="replace")
+            raise RuntimeError(
+                f"{method} {response.url} failed: {response.status_code} "
+                f"{response.reason_phrase}: {detail}"
+            )
 
         if not raw:
             return {}
-        return json.loads(raw.decode("utf-8"))
+        return orjson.loads(raw)
 
     def mcp_call(self, name: str, arguments: dict[str, Any]) -> dict[str, Any]:
         payload = {
@@ -78,6 +109,37 @@ class HttpClient:
         return response.get("result", {})
 
 
+# Fields that are identical for every demo receipt; copied per receipt.
+_RECEIPT_TEMPLATE = MappingProxyType({
+    "schema_version": "1.0",
+    "parent_task_id": "NA",
+    "dedupe_key": "NA",
+    "attempt": 0,
+    "source_system": "receiptgate-demo",
+    "trust_domain": "demo",
+    "realtime": False,
+    "task_type": "demo.task",
+    "expected_outcome_kind": "response_text",
+    "expected_artifact_mime": "NA",
+    "artifact_location": "NA",
+    "artifact_pointer": "NA",
+    "artifact_checksum": "NA",
+    "artifact_size_bytes": 0,
+    "artifact_mime": "NA",
+    "escalation_class": "NA",
+    "escalation_reason": "NA",
+    "escalation_to": "NA",
+    "retry_requested": False,
+    "stored_at": None,
+    "read_at": None,
+    "archived_at": None,
+})
+
+
+def _utc_now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
 def _build_receipt(
     *,
     receipt_id: str,
@@ -89,57 +151,49 @@ def _build_receipt(
     outcome_kind: str = "NA",
     outcome_text: str = "NA",
 ) -> dict[str, Any]:
-    now = datetime.now(timezone.utc).isoformat()
-    completed_at = now if phase == "complete" else None
-    return {
-        "schema_version": "1.0",
-        "receipt_id": receipt_id,
-        "task_id": task_id,
-        "parent_task_id": "NA",
-        "caused_by_receipt_id": caused_by_receipt_id,
-        "dedupe_key": "NA",
-        "attempt": 0,
-        "from_principal": recipient_ai,
-        "for_principal": recipient_ai,
-        "source_system": "receiptgate-demo",
-        "recipient_ai": recipient_ai,
-        "trust_domain": "demo",
-        "phase": phase,
-        "status": status,
-        "realtime": False,
-        "task_type": "demo.task",
-        "task_summary": f"Demo task {phase}",
-        "task_body": f"Golden path {phase}",
-        "inputs": {},
-        "expected_outcome_kind": "response_text",
-        "expected_artifact_mime": "NA",
-        "outcome_kind": outcome_kind,
-        "outcome_text": outcome_text,
-        "artifact_location": "NA",
-        "artifact_pointer": "NA",
-        "artifact_checksum": "NA",
-        "artifact_size_bytes": 0,
-        "artifact_mime": "NA",
-        "escalation_class": "NA",
-        "escalation_reason": "NA",
-        "escalation_to": "NA",
-        "retry_requested": False,
-        "created_at": now,
-        "stored_at": None,
-        "started_at": now if phase == "accepted" else None,
-        "completed_at": completed_at,
-        "read_at": None,
-        "archived_at": None,
-        "metadata": {},
-    }
+    now = _utc_now().isoformat()
+    receipt = _RECEIPT_TEMPLATE.copy()
+    receipt.update(
+        receipt_id=receipt_id,
+        task_id=task_id,
+        caused_by_receipt_id=caused_by_receipt_id,
+        from_principal=recipient_ai,
+        for_principal=recipient_ai,
+        recipient_ai=recipient_ai,
+        phase=phase,
+        status=status,
+        task_summary=f"Demo task {phase}",
+        task_body=f"Golden path {phase}",
+        inputs={},
+        outcome_kind=outcome_kind,
+        outcome_text=outcome_text,
+        created_at=now,
+        started_at=now if phase == "accepted" else None,
+        completed_at=now if phase == "complete" else None,
+        metadata={},
+    )
+    return receipt
 
 
-def main() -> int:
-    base_url = _env("RECEIPTGATE_URL", "http://localhost:8000")
-    api_key = _env("RECEIPTGATE_API_KEY")
+def _poll(
+    fetch: Callable[[], Any],
+    done: Callable[[Any], bool],
+    timeout: float = 2.0,
+    initial_delay: float = 0.025,
+    max_delay: float = 0.2,
+) -> Any:
+    """Call fetch with exponential backoff until done(result) or timeout; return the last result."""
+    deadline = time.monotonic() + timeout
+    delay = initial_delay
+    result = fetch()
+    while not done(result) and time.monotonic() < deadline:
+        time.sleep(delay)
+        delay = min(delay * 2, max_delay)
+        result = fetch()
+    return result
 
-    client = HttpClient(base_url, api_key=api_key)
 
+def _golden_path(client: HttpClient) -> int:
     recipient = _env("RECEIPTGATE_DEMO_RECIPIENT", "agent:demo")
     task_id = f"task-{uuid4()}"
 
@@ -176,22 +230,55 @@ def main() -> int:
     print("Submitting complete receipt (MCP)...")
     client.mcp_call("receiptgate.submit_receipt", {"receipt": complete_payload})
 
-    time.sleep(0.5)
+    # Chain and inbox reads are independent; issue them concurrently over the shared pool
+    # and poll with backoff until the completion is visible in both.
+    with ThreadPoolExecutor(max_workers=2) as pool:
+
+        def _read_state() -> tuple[list[Any], bool]:
+            chain_future = pool.submit(
+                client.mcp_call, "receiptgate.get_receipt_chain", {"receipt_id": complete_receipt_id}
+            )
+            inbox_future = pool.submit(
+                client.mcp_call, "receiptgate.list_inbox", {"recipient_ai": recipient, "limit": 20}
+            )
+            chain = chain_future.result()
+            inbox_after = inbox_future.result()
+            chain_ids = [entry.get("receipt_id") for entry in chain.get("chain", [])]
+            still_open = any(
+                item.get("task_id") == task_id for item in inbox_after.get("receipts", [])
+            )
+            return chain_ids, still_open
+
+        def _settled(state: tuple[list[Any], bool]) -> bool:
+            chain_ids, still_open = state
+            return (
+                accepted_receipt_id in chain_ids
+                and complete_receipt_id in chain_ids
+                and not still_open
+            )
+
+        chain_ids, still_open = _poll(_read_state, _settled)
 
-    chain = client.mcp_call("receiptgate.get_receipt_chain", {"receipt_id": complete_receipt_id})
-    chain_ids = [entry.get("receipt_id") for entry in chain.get("chain", [])]
     if accepted_receipt_id not in chain_ids or complete_receipt_id not in chain_ids:
         raise RuntimeError(f"Chain missing receipts: {chain_ids}")
-
-    inbox_after = client.mcp_call("receiptgate.list_inbox", {"recipient_ai": recipient, "limit": 20})
-    inbox_items_after = inbox_after.get("receipts", [])
-    if any(item.get("task_id") == task_id for item in inbox_items_after):
+    if still_open:
         raise RuntimeError("Obligation still open after completion")
 
     print("Golden path complete: inbox closed and chain verified.")
     return 0
 
 
+def main() -> int:
+    base_url = _env("RECEIPTGATE_URL", "http://localhost:8000")
+    api_key = _env("RECEIPTGATE_API_KEY")
+
+    uds = _env("RECEIPTGATE_UDS")
+    http2 = (_env("RECEIPTGATE_HTTP2", "false") or "").strip().lower() in {"1", "true", "yes", "on"}
+
+    with HttpClient(base_url, api_key=api_key, uds=uds, http2=http2) as client:
+        return _golden_path(client)
+
+
 if __name__ == "__main__":
     try:
         raise SystemExit(main())
@@ -12,7 +12,7 @@ from typing import Optional
 
 from fastapi import Header, HTTPException, status
 
-from receiptgate.config import settings
+from receiptgate.config import api_key_digest, settings
 
 logger = logging.getLogger(__name__)
 
@@ -40,8 +40,8 @@ def verify_api_key(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    configured = settings.api_key_value
-    if not configured:
+    key_index = settings.api_key_index
+    if not key_index:
         logger.error(
             "SECURITY VIOLATION: api_key not configured. "
             "Set RECEIPTGATE_API_KEY or enable RECEIPTGATE_ALLOW_INSECURE_DEV=true (dev only)."
@@ -51,7 +51,11 @@ def verify_api_key(
             detail="Server misconfigured: authentication not properly initialized",
         )
 
-    if not secrets.compare_digest(api_key, configured):
+    # One keyed-digest lookup selects the candidate key; unknown keys are rejected
+    # without a comparison, and a hit is confirmed in constant time.
+    presented = api_key.encode("utf-8")
+    stored = key_index.get(api_key_digest(api_key))
+    if stored is None or not secrets.compare_digest(presented, stored):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid API key",
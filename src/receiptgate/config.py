@@ -2,13 +2,32 @@
 
 from __future__ import annotations
 
+import hashlib
+import hmac
 import os
-from typing import Literal
+import secrets
+from functools import cached_property
+from typing import Any, Literal
 from datetime import datetime, timezone
 
 from pydantic import Field, SecretStr, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+# Cached derived values, keyed by the field(s) they are computed from.
+_DERIVED_FROM_FIELD = {
+    "api_key": ("api_key_value", "api_key_index"),
+    "api_keys": ("api_key_index",),
+    "database_url": ("db_backend",),
+}
+
+# Per-process secret so index digests reveal nothing about configured keys.
+_API_KEY_INDEX_SECRET = secrets.token_bytes(32)
+
+
+def api_key_digest(key: str) -> bytes:
+    """Return the keyed digest used to index configured API keys."""
+    return hmac.new(_API_KEY_INDEX_SECRET, key.encode("utf-8"), hashlib.sha256).digest()[:16]
+
 
 class Settings(BaseSettings):
     """ReceiptGate configuration."""
@@ -44,6 +63,10 @@ class Settings(BaseSettings):
         default=True,
         description="Apply schema files on startup (dev friendly)",
     )
+    db_pool_size: int = Field(default=20, description="Persistent connections per worker")
+    db_max_overflow: int = Field(default=40, description="Burst connections above pool size")
+    db_pool_recycle: int = Field(default=1800, description="Recycle connections after N seconds")
+    db_pool_timeout: int = Field(default=5, description="Seconds to wait for a pooled connection")
     enable_graph_layer: bool = Field(
         default=True,
         description="Apply graph schema (003) on startup",
@@ -55,6 +78,10 @@ class Settings(BaseSettings):
 
     # Authentication
     api_key: SecretStr = Field(default=SecretStr(""), description="API key for authentication")
+    api_keys: SecretStr = Field(
+        default=SecretStr(""),
+        description="Additional accepted API keys (comma-separated)",
+    )
     allow_insecure_dev: bool = Field(
         default=False,
         description="Allow unauthenticated access (dev only)",
@@ -63,6 +90,14 @@ class Settings(BaseSettings):
     # Receipt validation limits
     receipt_body_max_bytes: int = Field(default=262144, description="Max body size in bytes")
     receipt_chain_max_depth: int = Field(default=2048, description="Max chain traversal depth")
+    receipt_batch_max_size: int = Field(
+        default=500,
+        description="Max receipts per batch submission",
+    )
+    receipt_cache_size: int = Field(
+        default=10000,
+        description="Receipts kept in the read cache (0 disables)",
+    )
     search_default_limit: int = Field(default=50, description="Default search limit")
     search_max_limit: int = Field(default=500, description="Max search limit")
     enforce_cause_exists: bool = Field(
@@ -93,11 +128,21 @@ class Settings(BaseSettings):
         description="Log receipt bodies (discouraged for sensitive payloads)",
     )
 
-    @property
+    @cached_property
     def api_key_value(self) -> str:
         return self.api_key.get_secret_value()
 
-    @property
+    @cached_property
+    def api_key_index(self) -> dict[bytes, bytes]:
+        """Map keyed digest -> key bytes for every accepted API key."""
+        keys = [self.api_key_value, *self.api_keys.get_secret_value().split(",")]
+        return {
+            api_key_digest(key): key.encode("utf-8")
+            for key in (k.strip() for k in keys)
+            if key
+        }
+
+    @cached_property
     def db_backend(self) -> Literal["postgres", "sqlite", "other"]:
         url = self.database_url.lower()
         if url.startswith("postgresql"):
@@ -106,6 +151,11 @@ class Settings(BaseSettings):
             return "sqlite"
         return "other"
 
+    def __setattr__(self, name: str, value: Any) -> None:
+        super().__setattr__(name, value)
+        for derived in _DERIVED_FROM_FIELD.get(name, ()):
+            self.__dict__.pop(derived, None)
+
     @field_validator("database_url", mode="before")
     @classmethod
     def prefer_global_database_url(cls, v: str) -> str:
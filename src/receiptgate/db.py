@@ -3,10 +3,14 @@
 from __future__ import annotations
 
 import logging
+from contextvars import ContextVar
+from functools import cache
 from pathlib import Path
-from typing import Generator
+from typing import Any, Generator
 
-from sqlalchemy import create_engine, text
+import orjson
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import make_url
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import sessionmaker
 
@@ -30,7 +34,8 @@ def _schema_dir() -> Path:
     return _schema_root() / "schema"
 
 
-def _read_sql_file(path: Path) -> list[str]:
+@cache
+def _parse_sql_file(path: Path, mtime_ns: int) -> tuple[str, ...]:
     sql = path.read_text(encoding="utf-8")
     statements = []
     for stmt in sql.split(";"):
@@ -41,7 +46,12 @@ def _read_sql_file(path: Path) -> list[str]:
         if upper == "BEGIN" or upper == "COMMIT":
             continue
         statements.append(cleaned)
-    return statements
+    return tuple(statements)
+
+
+def _read_sql_file(path: Path) -> tuple[str, ...]:
+    """Return the statements in a schema file, re-parsing only when it changes."""
+    return _parse_sql_file(path, path.stat().st_mtime_ns)
 
 
 def apply_schema(engine) -> None:
@@ -60,18 +70,75 @@ def apply_schema(engine) -> None:
                 continue
             if path.name.startswith("004") and not settings.enable_semantic_layer:
                 continue
-            for statement in _read_sql_file(path):
-                conn.exec_driver_sql(statement)
+            statements = _read_sql_file(path)
+            if engine.dialect.name == "postgresql":
+                # psycopg accepts several statements per execute: one round-trip per file.
+                conn.exec_driver_sql(";\n".join(statements))
+            else:
+                for statement in statements:
+                    conn.exec_driver_sql(statement)
 
 
-def init_db() -> None:
-    """Initialize database connection and optionally apply schema files."""
-    engine_kwargs = {"pool_pre_ping": True}
+def _engine_kwargs() -> dict[str, Any]:
+    engine_kwargs: dict[str, Any] = {"pool_pre_ping": True}
     if settings.db_backend == "sqlite":
         engine_kwargs["connect_args"] = {"check_same_thread": False}
+    else:
+        engine_kwargs.update(
+            pool_size=settings.db_pool_size,
+            max_overflow=settings.db_max_overflow,
+            pool_recycle=settings.db_pool_recycle,
+            pool_timeout=settings.db_pool_timeout,
+            # LIFO keeps a small set of connections hot; idle extras age out.
+            pool_use_lifo=True,
+        )
+        if make_url(settings.database_url).get_driver_name() == "psycopg":
+            # Server-prepare ledger statements on their first execution; the
+            # default threshold (5) leaves most pooled connections unprepared.
+            engine_kwargs["connect_args"] = {"prepare_threshold": 1}
+    return engine_kwargs
+
+
+def _use_orjson_loads(dbapi_connection, connection_record) -> None:
+    from psycopg.types.json import set_json_loads
+
+    # JSONB payloads are decoded by the driver on every read; orjson parses
+    # them several times faster than the stdlib json.loads default.
+    set_json_loads(orjson.loads, dbapi_connection)
+
+
+# Multi-row INSERT ... ON CONFLICT DO NOTHING RETURNING needs SQLite 3.35.
+_MIN_SQLITE_VERSION = (3, 35, 0)
+
+
+def require_json_support(engine) -> None:
+    """
+    Fail fast when SQLite is too old or lacks the JSON1 functions the ledger uses.
+
+    Payload projections (created_at) run json_extract in SQL; there is no
+    Python fallback that decodes payloads row by row. Batch inserts rely on
+    RETURNING, which SQLite added in 3.35.
+    """
+    if engine.dialect.name != "sqlite":
+        return
+    try:
+        with engine.connect() as conn:
+            version = conn.execute(text("SELECT sqlite_version()")).scalar()
+            conn.execute(text("SELECT json_extract('{\"a\": 1}', '$.a')")).scalar()
+    except SQLAlchemyError as exc:
+        raise RuntimeError("SQLite build lacks JSON1 support (json_extract)") from exc
+    if tuple(int(part) for part in str(version).split(".")[:3]) < _MIN_SQLITE_VERSION:
+        minimum = ".".join(str(part) for part in _MIN_SQLITE_VERSION)
+        raise RuntimeError(f"SQLite {version} is too old; ReceiptGate needs SQLite >= {minimum}")
 
-    DB.engine = create_engine(settings.database_url, **engine_kwargs)
+
+def init_db() -> None:
+    """Initialize database connection and optionally apply schema files."""
+    DB.engine = create_engine(settings.database_url, **_engine_kwargs())
+    if DB.engine.dialect.driver == "psycopg":
+        event.listen(DB.engine, "connect", _use_orjson_loads)
     DB.SessionLocal = sessionmaker(bind=DB.engine)
+    require_json_support(DB.engine)
 
     if settings.auto_migrate_on_startup:
         try:
@@ -80,7 +147,64 @@ def init_db() -> None:
             raise RuntimeError("Failed to apply schema migrations") from exc
 
 
+class _SessionSlot:
+    __slots__ = ("session",)
+
+    def __init__(self) -> None:
+        self.session = None
+
+
+_request_session: ContextVar[_SessionSlot | None] = ContextVar(
+    "receiptgate_request_session",
+    default=None,
+)
+
+
+def current_session():
+    """Return the request-scoped session, opening it on first use."""
+    slot = _request_session.get()
+    if slot is None:
+        raise RuntimeError("No request session scope active")
+    if slot.session is None:
+        if DB.SessionLocal is None:
+            raise RuntimeError("Database not initialized")
+        slot.session = DB.SessionLocal()
+    return slot.session
+
+
+class DBSessionMiddleware:
+    """ASGI middleware that scopes one lazily-opened DB session to each HTTP request."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        slot = _SessionSlot()
+        token = _request_session.set(slot)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _request_session.reset(token)
+            if slot.session is not None:
+                slot.session.close()
+
+
 def get_db_session() -> Generator:
+    """
+    Dependency yielding a DB session.
+
+    Inside an HTTP request this is the request-scoped session, so a route using
+    Depends(get_db_session) shares one pooled connection with current_session()
+    and DBSessionMiddleware closes it. Outside a request a fresh session is
+    opened and closed here.
+    """
+    if _request_session.get() is not None:
+        yield current_session()
+        return
     if DB.SessionLocal is None:
         raise RuntimeError("Database not initialized")
     db = DB.SessionLocal()
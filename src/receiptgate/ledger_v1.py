@@ -2,20 +2,30 @@
 
 from __future__ import annotations
 
-import json
 import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Iterator, Sequence
 from datetime import datetime, timezone
-from typing import Any
-from uuid import uuid4
+from functools import cache, lru_cache
+from typing import Any, Generic, TypeVar
 
+import orjson
 from sqlalchemy import bindparam, text
-from sqlalchemy.exc import IntegrityError
 
+from receiptgate.config import settings
 from receiptgate.validation_v1 import TERMINAL_PHASES
 from receiptgate.utils import canonical_hash
 
 logger = logging.getLogger(__name__)
 
+_TERMINAL_PHASES_SORTED = tuple(sorted(TERMINAL_PHASES))
+
+# Server-side cursor fetched in chunks, for responses streamed row by row.
+_STREAM_OPTIONS = {"stream_results": True, "yield_per": 500}
+
 
 class ReceiptConflictError(Exception):
     def __init__(self, *, receipt_id: str, existing_hash: str, incoming_hash: str) -> None:
@@ -25,8 +35,98 @@ class ReceiptConflictError(Exception):
         super().__init__("receipt_id collision with different canonical hash")
 
 
+_V = TypeVar("_V")
+
+
+class _ReceiptCache(Generic[_V]):
+    """Thread-safe LRU of per-receipt values; receipts are immutable once written."""
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self._entries: OrderedDict[tuple[Any, str, str], _V] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple[Any, str, str]) -> _V | None:
+        with self._lock:
+            payload = self._entries.get(key)
+            if payload is not None:
+                self._entries.move_to_end(key)
+            return payload
+
+    def put(self, key: tuple[Any, str, str], payload: _V) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[key] = payload
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def discard(self, key: tuple[Any, str, str]) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+# Encoded payloads: every hit decodes a fresh dict, so callers cannot mutate cached state.
+_receipt_cache: _ReceiptCache[bytes] = _ReceiptCache(settings.receipt_cache_size)
+# Canonical hashes of stored receipts, so idempotent replays skip rehashing them.
+_hash_cache: _ReceiptCache[str] = _ReceiptCache(settings.receipt_cache_size)
+
+
+def _cache_key(db, tenant_id: str, receipt_id: str) -> tuple[Any, str, str]:
+    # Keyed by engine so sessions on different databases never share entries.
+    return (db.get_bind(), tenant_id, receipt_id)
+
+
+@lru_cache(maxsize=4)
+def _format_second(epoch_second: int) -> str:
+    return datetime.fromtimestamp(epoch_second, timezone.utc).strftime("%Y-%m-%dT%H:%M:%S")
+
+
 def _now_iso() -> str:
-    return datetime.now(timezone.utc).isoformat()
+    # Consecutive writes almost always share a second, so only the fraction is
+    # formatted per call. Microseconds are always written, keeping values the
+    # same width (isoformat() drops them when zero) and lexically ordered.
+    epoch_second, micros = divmod(time.time_ns() // 1000, 1_000_000)
+    return f"{_format_second(epoch_second)}.{micros:06d}+00:00"
+
+
+def _dump_payload(payload: dict[str, Any]) -> str:
+    return orjson.dumps(payload, default=str, option=orjson.OPT_NON_STR_KEYS).decode()
+
+
+def _load_payload(raw: Any) -> dict[str, Any]:
+    if not raw:
+        return {}
+    if isinstance(raw, dict):
+        # psycopg decodes JSONB columns itself.
+        return raw
+    try:
+        return orjson.loads(raw)
+    except orjson.JSONDecodeError:
+        return {}
+
+
+def _row_payload(raw_payload: Any, stored_at: Any) -> dict[str, Any]:
+    payload = _load_payload(raw_payload)
+    if "stored_at" not in payload:
+        payload["stored_at"] = stored_at
+    return payload
+
+
+def _is_postgres(db) -> bool:
+    return db.get_bind().dialect.name == "postgresql"
+
+
+def _created_at_column(postgres: bool) -> str:
+    """SQL projecting payload.created_at so readers need not decode the payload."""
+    if postgres:
+        return "payload->>'created_at' AS created_at"
+    return "json_extract(payload, '$.created_at') AS created_at"
 
 
 def _canonical_payload(payload: dict[str, Any]) -> dict[str, Any]:
@@ -38,231 +138,502 @@ def _canonical_payload(payload: dict[str, Any]) -> dict[str, Any]:
 
 def _canonical_receipt_hash(payload: dict[str, Any]) -> str:
     canonical_payload = _canonical_payload(payload)
-    include_created_at = canonical_payload.get("created_at") is not None
-    _, digest = canonical_hash(canonical_payload, include_created_at=include_created_at)
+    if canonical_payload.get("created_at") is None:
+        # Drop it from the copy already made rather than have canonical_hash copy again.
+        canonical_payload.pop("created_at", None)
+    _, digest = canonical_hash(canonical_payload, include_created_at=True)
     return digest
 
 
-def store_receipt(db, payload: dict[str, Any], tenant_id: str) -> dict[str, Any]:
-    stored_at = _now_iso()
-    receipt_id = payload.get("receipt_id")
-    if not receipt_id:
-        raise ValueError("receipt_id is required")
+def _stored_receipt_hash(key: tuple[Any, str, str], stored: dict[str, Any]) -> str:
+    digest = _hash_cache.get(key)
+    if digest is None:
+        digest = _canonical_receipt_hash(stored)
+        _hash_cache.put(key, digest)
+    return digest
+
 
-    record = {
-        "uuid": str(uuid4()),
+def _uuid7() -> str:
+    """
+    Time-ordered UUIDv7 string for the receipts_v1 primary key.
+
+    Leading millisecond timestamps make new keys land at the right edge of the
+    primary-key B-tree instead of on random pages as uuid4 does.
+    """
+    rand = int.from_bytes(os.urandom(10), "big")
+    value = (
+        (time.time_ns() // 1_000_000) << 80
+        | 0x7 << 76
+        | (rand >> 64 & 0xFFF) << 64
+        | 0b10 << 62
+        | rand & 0x3FFF_FFFF_FFFF_FFFF
+    )
+    digits = f"{value:032x}"
+    return f"{digits[:8]}-{digits[8:12]}-{digits[12:16]}-{digits[16:20]}-{digits[20:]}"
+
+
+def _receipt_record(payload: dict[str, Any], tenant_id: str, stored_at: str) -> dict[str, Any]:
+    return {
+        "uuid": _uuid7(),
         "tenant_id": tenant_id,
-        "receipt_id": receipt_id,
+        "receipt_id": payload["receipt_id"],
         "stored_at": stored_at,
         "recipient_ai": payload.get("recipient_ai", "NA"),
         "task_id": payload.get("task_id", "NA"),
         "phase": payload.get("phase", "accepted"),
         "caused_by_receipt_id": payload.get("caused_by_receipt_id", "NA"),
         "archived_at": payload.get("archived_at"),
-        "payload": json.dumps(payload, default=str),
+        "payload": _dump_payload(payload),
     }
 
-    try:
-        db.execute(
-            text(
-                """
-                INSERT INTO receipts_v1 (
-                    uuid, tenant_id, receipt_id, stored_at, recipient_ai, task_id,
-                    phase, caused_by_receipt_id, archived_at, payload
-                )
-                VALUES (
-                    :uuid, :tenant_id, :receipt_id, :stored_at, :recipient_ai, :task_id,
-                    :phase, :caused_by_receipt_id, :archived_at, :payload
-                )
-                """
-            ),
-            record,
+
+# Statements are built once and reused: SQLAlchemy's compiled cache is keyed on
+# the construct, and identical SQL lets psycopg reuse its server-side prepare.
+@cache
+def _insert_statement(postgres: bool, skip_existing: bool = False):
+    payload_param = "CAST(:payload AS JSONB)" if postgres else ":payload"
+    # Both backends accept ON CONFLICT on the (tenant_id, receipt_id) unique index.
+    on_conflict = "ON CONFLICT (tenant_id, receipt_id) DO NOTHING" if skip_existing else ""
+    return text(
+        f"""
+        INSERT INTO receipts_v1 (
+            uuid, tenant_id, receipt_id, stored_at, recipient_ai, task_id,
+            phase, caused_by_receipt_id, archived_at, payload
+        )
+        VALUES (
+            :uuid, :tenant_id, :receipt_id, :stored_at, :recipient_ai, :task_id,
+            :phase, :caused_by_receipt_id, :archived_at, {payload_param}
         )
+        {on_conflict}
+        """
+    )
+
+
+def _insert_record(db, record: dict[str, Any], skip_existing: bool = False) -> bool:
+    """Insert and commit one receipt row; False if skip_existing found it already stored."""
+    try:
+        result = db.execute(_insert_statement(_is_postgres(db), skip_existing), record)
         db.commit()
     except Exception:
         db.rollback()
         raise
+    if skip_existing and result.rowcount == 0:
+        return False
+    _receipt_cache.discard(_cache_key(db, record["tenant_id"], record["receipt_id"]))
 
     logger.info(
         "receiptgate_v1_receipt_stored",
-        receipt_id=receipt_id,
-        tenant_id=tenant_id,
+        receipt_id=record["receipt_id"],
+        tenant_id=record["tenant_id"],
         task_id=record.get("task_id"),
         phase=record.get("phase"),
         recipient_ai=record.get("recipient_ai"),
         caused_by_receipt_id=record.get("caused_by_receipt_id"),
     )
+    return True
 
+
+def store_receipt(db, payload: dict[str, Any], tenant_id: str) -> dict[str, Any]:
+    stored_at = _now_iso()
+    receipt_id = payload.get("receipt_id")
+    if not receipt_id:
+        raise ValueError("receipt_id is required")
+
+    _insert_record(db, _receipt_record(payload, tenant_id, stored_at))
     return {"receipt_id": receipt_id, "stored_at": stored_at, "tenant_id": tenant_id}
 
 
+def _replay_result(
+    db, existing: dict[str, Any], receipt_id: str, tenant_id: str, incoming_hash: str
+) -> dict[str, Any]:
+    existing_hash = _stored_receipt_hash(_cache_key(db, tenant_id, receipt_id), existing)
+    if existing_hash != incoming_hash:
+        raise ReceiptConflictError(
+            receipt_id=receipt_id,
+            existing_hash=existing_hash,
+            incoming_hash=incoming_hash,
+        )
+    return {
+        "receipt_id": receipt_id,
+        "stored_at": existing.get("stored_at"),
+        "tenant_id": tenant_id,
+        "canonical_hash": incoming_hash,
+        "idempotent_replay": True,
+    }
+
+
 def put_receipt(db, payload: dict[str, Any], tenant_id: str) -> dict[str, Any]:
     receipt_id = payload.get("receipt_id")
     if not receipt_id:
         raise ValueError("receipt_id is required")
 
     incoming_hash = _canonical_receipt_hash(payload)
+    key = _cache_key(db, tenant_id, receipt_id)
+    cached = _receipt_cache.get(key)
+    if cached is not None:
+        return _replay_result(db, _load_payload(cached), receipt_id, tenant_id, incoming_hash)
+
+    # Insert first and look the receipt up only if it already existed: a new
+    # receipt (the common case) costs one statement instead of a SELECT
+    # followed by the INSERT, and concurrent writers of the same receipt_id
+    # need no IntegrityError handling.
+    stored_at = _now_iso()
+    if _insert_record(db, _receipt_record(payload, tenant_id, stored_at), skip_existing=True):
+        _hash_cache.put(key, incoming_hash)
+        return {
+            "receipt_id": receipt_id,
+            "stored_at": stored_at,
+            "tenant_id": tenant_id,
+            "canonical_hash": incoming_hash,
+            "idempotent_replay": False,
+        }
+
     existing = get_receipt(db, tenant_id, receipt_id)
-    if existing:
-        existing_hash = _canonical_receipt_hash(existing)
-        if existing_hash == incoming_hash:
-            return {
-                "receipt_id": receipt_id,
-                "stored_at": existing.get("stored_at"),
-                "tenant_id": tenant_id,
-                "canonical_hash": incoming_hash,
-                "idempotent_replay": True,
-            }
-        raise ReceiptConflictError(
-            receipt_id=receipt_id,
-            existing_hash=existing_hash,
-            incoming_hash=incoming_hash,
+    if existing is None:
+        raise RuntimeError(f"receipt {receipt_id} conflicted on insert but is not stored")
+    return _replay_result(db, existing, receipt_id, tenant_id, incoming_hash)
+
+
+@cache
+def _get_receipts_statement(postgres: bool):
+    if postgres:
+        # One array parameter: a single SQL text (and prepared plan) for any batch size.
+        return text(
+            """
+            SELECT receipt_id, payload, stored_at
+            FROM receipts_v1
+            WHERE tenant_id = :tenant_id AND receipt_id = ANY(:receipt_ids)
+            """
         )
+    return text(
+        """
+        SELECT receipt_id, payload, stored_at
+        FROM receipts_v1
+        WHERE tenant_id = :tenant_id AND receipt_id IN :receipt_ids
+        """
+    ).bindparams(bindparam("receipt_ids", expanding=True))
 
-    try:
-        result = store_receipt(db, payload, tenant_id)
-    except IntegrityError:
-        existing = get_receipt(db, tenant_id, receipt_id)
-        if existing:
-            existing_hash = _canonical_receipt_hash(existing)
-            if existing_hash == incoming_hash:
-                return {
-                    "receipt_id": receipt_id,
-                    "stored_at": existing.get("stored_at"),
-                    "tenant_id": tenant_id,
-                    "canonical_hash": incoming_hash,
-                    "idempotent_replay": True,
-                }
+
+def _get_receipts(db, tenant_id: str, receipt_ids: list[str]) -> dict[str, dict[str, Any]]:
+    if not receipt_ids:
+        return {}
+    rows = db.execute(
+        _get_receipts_statement(_is_postgres(db)),
+        {"tenant_id": tenant_id, "receipt_ids": list(receipt_ids)},
+    )
+    return {
+        receipt_id: _row_payload(raw_payload, stored_at)
+        for receipt_id, raw_payload, stored_at in rows
+    }
+
+
+_RECEIPT_COLUMNS = (
+    "uuid",
+    "tenant_id",
+    "receipt_id",
+    "stored_at",
+    "recipient_ai",
+    "task_id",
+    "phase",
+    "caused_by_receipt_id",
+    "archived_at",
+    "payload",
+)
+
+# Rows per multi-row INSERT: 10 parameters each keeps a batch far below the
+# bind-parameter caps of Postgres (65535) and SQLite (32766).
+_INSERT_BATCH_ROWS = 500
+
+
+@lru_cache(maxsize=64)
+def _insert_values_statement(postgres: bool, rows: int):
+    """Multi-row INSERT of `rows` receipts that skips stored ids and returns the inserted ones."""
+    payload_param = "CAST(:payload_{i} AS JSONB)" if postgres else ":payload_{i}"
+    row_template = "(" + ", ".join(
+        payload_param if column == "payload" else f":{column}_{{i}}" for column in _RECEIPT_COLUMNS
+    ) + ")"
+    values = ",\n".join(row_template.format(i=i) for i in range(rows))
+    return text(
+        f"""
+        INSERT INTO receipts_v1 ({", ".join(_RECEIPT_COLUMNS)})
+        VALUES {values}
+        ON CONFLICT (tenant_id, receipt_id) DO NOTHING
+        RETURNING receipt_id
+        """
+    )
+
+
+def _insert_new_records(db, records: list[dict[str, Any]]) -> set[str]:
+    """Insert records in multi-row batches without committing; return the ids actually inserted."""
+    postgres = _is_postgres(db)
+    inserted: set[str] = set()
+    for start in range(0, len(records), _INSERT_BATCH_ROWS):
+        batch = records[start:start + _INSERT_BATCH_ROWS]
+        params = {
+            f"{column}_{i}": record[column]
+            for i, record in enumerate(batch)
+            for column in _RECEIPT_COLUMNS
+        }
+        rows = db.execute(_insert_values_statement(postgres, len(batch)), params)
+        inserted.update(receipt_id for (receipt_id,) in rows)
+    return inserted
+
+
+def put_receipts(db, payloads: list[dict[str, Any]], tenant_id: str) -> list[dict[str, Any]]:
+    """
+    Idempotently append a batch of receipts, mirroring put_receipt per entry.
+
+    Receipts already stored (or repeated within the batch) with the same
+    canonical hash are reported as replays; a differing hash raises
+    ReceiptConflictError and nothing from the batch is stored.
+
+    New receipts are written first with multi-row INSERT ... ON CONFLICT DO
+    NOTHING RETURNING, so only the ids that turned out to exist are read back.
+    """
+    hashes: list[str] = []
+    first: dict[str, dict[str, Any]] = {}
+    first_hashes: dict[str, str] = {}
+    for payload in payloads:
+        receipt_id = payload.get("receipt_id")
+        if not receipt_id:
+            raise ValueError("receipt_id is required")
+        incoming_hash = _canonical_receipt_hash(payload)
+        hashes.append(incoming_hash)
+        first.setdefault(receipt_id, payload)
+        expected = first_hashes.setdefault(receipt_id, incoming_hash)
+        if expected != incoming_hash:
             raise ReceiptConflictError(
                 receipt_id=receipt_id,
-                existing_hash=existing_hash,
+                existing_hash=expected,
                 incoming_hash=incoming_hash,
             )
-        raise
-
-    result.update({"canonical_hash": incoming_hash, "idempotent_replay": False})
-    return result
 
+    stored_at = _now_iso()
+    records = [_receipt_record(payload, tenant_id, stored_at) for payload in first.values()]
+    try:
+        inserted = _insert_new_records(db, records)
+        existing = _get_receipts(db, tenant_id, sorted(first.keys() - inserted))
+        known: dict[str, Any] = {}
+        for receipt_id, stored in existing.items():
+            existing_hash = _stored_receipt_hash(_cache_key(db, tenant_id, receipt_id), stored)
+            if existing_hash != first_hashes[receipt_id]:
+                raise ReceiptConflictError(
+                    receipt_id=receipt_id,
+                    existing_hash=existing_hash,
+                    incoming_hash=first_hashes[receipt_id],
+                )
+            known[receipt_id] = stored.get("stored_at")
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
 
-def list_inbox(db, tenant_id: str, recipient_ai: str, limit: int = 20) -> dict[str, Any]:
-    terminal_phases = sorted(TERMINAL_PHASES)
-    query = text(
-        """
-        SELECT receipt_id, task_id, phase, stored_at
+    for receipt_id in inserted:
+        key = _cache_key(db, tenant_id, receipt_id)
+        _receipt_cache.discard(key)
+        _hash_cache.put(key, first_hashes[receipt_id])
+    logger.info("receiptgate_v1_receipts_stored count=%d tenant_id=%s", len(inserted), tenant_id)
+
+    results: list[dict[str, Any]] = []
+    seen: set[str] = set()
+    for payload, incoming_hash in zip(payloads, hashes):
+        receipt_id = payload["receipt_id"]
+        replay = receipt_id in known or receipt_id in seen
+        seen.add(receipt_id)
+        results.append({
+            "receipt_id": receipt_id,
+            "stored_at": known.get(receipt_id, stored_at),
+            "tenant_id": tenant_id,
+            "canonical_hash": incoming_hash,
+            "idempotent_replay": replay,
+        })
+    return results
+
+
+@cache
+def _list_inbox_statement(postgres: bool):
+    # Postgres binds the phases as one text[] (= ANY), SQLite expands them into IN.
+    # NOT EXISTS stops at the first terminal receipt found via idx_receipts_v1_task_phase
+    # instead of joining every terminal row of the task before discarding it.
+    terminal_match = "= ANY(:terminal_phases)" if postgres else "IN :terminal_phases"
+    statement = text(
+        f"""
+        SELECT r.receipt_id, r.task_id, r.phase, r.stored_at
         FROM receipts_v1 r
-        WHERE tenant_id = :tenant_id
-          AND recipient_ai = :recipient_ai
-          AND phase = 'accepted'
-          AND archived_at IS NULL
+        WHERE r.tenant_id = :tenant_id
+          AND r.recipient_ai = :recipient_ai
+          AND r.phase = 'accepted'
+          AND r.archived_at IS NULL
           AND NOT EXISTS (
-            SELECT 1 FROM receipts_v1 t
+            SELECT 1
+            FROM receipts_v1 t
             WHERE t.tenant_id = r.tenant_id
               AND t.task_id = r.task_id
-              AND t.phase IN :terminal_phases
+              AND t.phase {terminal_match}
           )
-        ORDER BY stored_at DESC
+        ORDER BY r.stored_at DESC
         LIMIT :limit
         """
-    ).bindparams(bindparam("terminal_phases", expanding=True))
+    )
+    if postgres:
+        return statement
+    return statement.bindparams(bindparam("terminal_phases", expanding=True))
+
+
+def list_inbox(db, tenant_id: str, recipient_ai: str, limit: int = 20) -> dict[str, Any]:
     rows = db.execute(
-        query,
+        _list_inbox_statement(_is_postgres(db)),
         {
             "tenant_id": tenant_id,
             "recipient_ai": recipient_ai,
             "limit": limit,
-            "terminal_phases": terminal_phases,
+            "terminal_phases": list(_TERMINAL_PHASES_SORTED),
         },
-    ).mappings().all()
+    )
 
+    # Plain dicts built positionally: orjson cannot serialize a RowMapping natively.
+    receipts = [
+        {"receipt_id": receipt_id, "task_id": task_id, "phase": phase, "stored_at": stored_at}
+        for receipt_id, task_id, phase, stored_at in rows
+    ]
     return {
         "tenant_id": tenant_id,
         "recipient_ai": recipient_ai,
-        "count": len(rows),
-        "receipts": [dict(row) for row in rows],
+        "count": len(receipts),
+        "receipts": receipts,
     }
 
 
-def list_task_receipts(
+@cache
+def _task_receipts_statement(postgres: bool, sort_order: str, limited: bool, include_payload: bool):
+    payload_column = ", payload" if include_payload else ""
+    limit_clause = "LIMIT :limit" if limited else ""
+    return text(
+        f"""
+        SELECT receipt_id, phase, stored_at, recipient_ai, task_id,
+               {_created_at_column(postgres)}{payload_column}
+        FROM receipts_v1
+        WHERE tenant_id = :tenant_id AND task_id = :task_id
+        ORDER BY stored_at {sort_order}, receipt_id {sort_order}
+        {limit_clause}
+        """
+    )
+
+
+def iter_task_receipts(
     db,
     tenant_id: str,
     task_id: str,
     sort: str = "asc",
     include_payload: bool = False,
     limit: int | None = None,
-) -> dict[str, Any]:
+    stream: bool = False,
+) -> Iterator[dict[str, Any]]:
+    """Yield task receipt entries; stream=True reads rows from a server-side cursor."""
     sort_order = "ASC" if sort.lower() == "asc" else "DESC"
-    limit_clause = "LIMIT :limit" if limit else ""
     params: dict[str, Any] = {"tenant_id": tenant_id, "task_id": task_id}
     if limit:
         params["limit"] = limit
 
-    rows = db.execute(
-        text(
-            f"""
-            SELECT receipt_id, phase, stored_at, recipient_ai, task_id, payload
-            FROM receipts_v1
-            WHERE tenant_id = :tenant_id AND task_id = :task_id
-            ORDER BY stored_at {sort_order}
-            {limit_clause}
-            """
-        ),
+    result = db.execute(
+        _task_receipts_statement(_is_postgres(db), sort_order, bool(limit), include_payload),
         params,
-    ).mappings().all()
-
-    receipts: list[dict[str, Any]] = []
-    for row in rows:
-        payload = {}
-        if row.get("payload"):
-            try:
-                payload = json.loads(row["payload"])
-            except json.JSONDecodeError:
-                payload = {}
+        execution_options=_STREAM_OPTIONS if stream else {},
+    )
+
+    # Rows unpack positionally in SELECT order; payload is the optional last column.
+    for receipt_id, phase, stored_at, recipient_ai, row_task_id, created_at, *payload in result:
         entry = {
-            "receipt_id": row.get("receipt_id"),
-            "phase": row.get("phase"),
-            "stored_at": row.get("stored_at"),
-            "recipient_ai": row.get("recipient_ai"),
-            "task_id": row.get("task_id"),
+            "receipt_id": receipt_id,
+            "phase": phase,
+            "stored_at": stored_at,
+            "recipient_ai": recipient_ai,
+            "task_id": row_task_id,
         }
-        if payload.get("created_at"):
-            entry["created_at"] = payload.get("created_at")
-        if include_payload:
-            entry["payload"] = payload
-        receipts.append(entry)
+        if created_at:
+            entry["created_at"] = created_at
+        if payload:
+            entry["payload"] = _load_payload(payload[0])
+        yield entry
+
 
+def list_task_receipts(
+    db,
+    tenant_id: str,
+    task_id: str,
+    sort: str = "asc",
+    include_payload: bool = False,
+    limit: int | None = None,
+) -> dict[str, Any]:
     return {
         "tenant_id": tenant_id,
         "task_id": task_id,
-        "receipts": receipts,
+        "receipts": list(iter_task_receipts(db, tenant_id, task_id, sort, include_payload, limit)),
     }
 
 
+_SQL_GET_RECEIPT = text(
+    """
+    SELECT payload, stored_at
+    FROM receipts_v1
+    WHERE tenant_id = :tenant_id AND receipt_id = :receipt_id
+    """
+)
+
+
 def get_receipt(db, tenant_id: str, receipt_id: str) -> dict[str, Any] | None:
+    key = _cache_key(db, tenant_id, receipt_id)
+    cached = _receipt_cache.get(key)
+    if cached is not None:
+        return _load_payload(cached)
+
     row = db.execute(
-        text(
-            """
-            SELECT payload, stored_at
-            FROM receipts_v1
-            WHERE tenant_id = :tenant_id AND receipt_id = :receipt_id
-            """
-        ),
+        _SQL_GET_RECEIPT,
         {"tenant_id": tenant_id, "receipt_id": receipt_id},
-    ).mappings().first()
-    if not row:
+    ).first()
+    if row is None:
         return None
 
-    payload = {}
-    if row.get("payload"):
-        try:
-            payload = json.loads(row["payload"])
-        except json.JSONDecodeError:
-            payload = {}
-    if "stored_at" not in payload:
-        payload["stored_at"] = row.get("stored_at")
+    payload = _row_payload(*row)
+    _receipt_cache.put(key, orjson.dumps(payload, default=str, option=orjson.OPT_NON_STR_KEYS))
     return payload
 
 
-def search_receipts(
+@cache
+def _search_statement(
+    postgres: bool,
+    by_phase: bool,
+    by_recipient: bool,
+    by_since: bool,
+    by_cursor: bool = False,
+):
+    conditions = ["tenant_id = :tenant_id", "task_id = :root_task_id"]
+    if by_phase:
+        conditions.append("phase = :phase")
+    if by_recipient:
+        conditions.append("recipient_ai = :recipient_ai")
+    if by_since:
+        conditions.append("stored_at >= :since")
+    if by_cursor:
+        # Keyset paging: seek past the previous page's last row instead of OFFSET.
+        cursor_stored_at = (
+            "CAST(:cursor_stored_at AS TIMESTAMPTZ)" if postgres else ":cursor_stored_at"
+        )
+        conditions.append(f"(stored_at, receipt_id) < ({cursor_stored_at}, :cursor_receipt_id)")
+    where_clause = " AND ".join(conditions)
+    return text(
+        f"""
+        SELECT receipt_id, phase, stored_at, recipient_ai, task_id,
+               {_created_at_column(postgres)}
+        FROM receipts_v1
+        WHERE {where_clause}
+        ORDER BY stored_at DESC, receipt_id DESC
+        LIMIT :limit
+        """
+    )
+
+
+def iter_search_receipts(
     db,
     tenant_id: str,
     root_task_id: str,
@@ -270,71 +641,115 @@ def search_receipts(
     recipient_ai: str | None = None,
     since: str | None = None,
     limit: int = 100,
-) -> dict[str, Any]:
-    conditions = ["tenant_id = :tenant_id", "task_id = :root_task_id"]
+    stream: bool = False,
+    cursor: Sequence[Any] | None = None,
+) -> Iterator[dict[str, Any]]:
+    """
+    Yield matching receipt headers, newest first.
+
+    cursor is a previous page's next_cursor, (stored_at, receipt_id) of its last row;
+    stream=True reads rows from a server-side cursor.
+    """
     params: dict[str, Any] = {"tenant_id": tenant_id, "root_task_id": root_task_id, "limit": limit}
-
     if phase:
-        conditions.append("phase = :phase")
         params["phase"] = phase
     if recipient_ai:
-        conditions.append("recipient_ai = :recipient_ai")
         params["recipient_ai"] = recipient_ai
     if since:
-        conditions.append("stored_at >= :since")
         params["since"] = since
+    if cursor:
+        params["cursor_stored_at"], params["cursor_receipt_id"] = cursor
 
-    where_clause = " AND ".join(conditions)
-    rows = db.execute(
-        text(
-            f"""
-            SELECT receipt_id, phase, stored_at, recipient_ai, task_id, payload
-            FROM receipts_v1
-            WHERE {where_clause}
-            ORDER BY stored_at DESC
-            LIMIT :limit
-            """
+    result = db.execute(
+        _search_statement(
+            _is_postgres(db), bool(phase), bool(recipient_ai), bool(since), bool(cursor)
         ),
         params,
-    ).mappings().all()
-
-    receipts: list[dict[str, Any]] = []
-    for row in rows:
-        payload = {}
-        if row.get("payload"):
-            try:
-                payload = json.loads(row["payload"])
-            except json.JSONDecodeError:
-                payload = {}
-        receipts.append({
-            "receipt_id": row.get("receipt_id"),
-            "phase": row.get("phase"),
-            "stored_at": row.get("stored_at"),
+        execution_options=_STREAM_OPTIONS if stream else {},
+    )
+
+    for receipt_id, row_phase, stored_at, row_recipient_ai, task_id, created_at in result:
+        yield {
+            "receipt_id": receipt_id,
+            "phase": row_phase,
+            "stored_at": stored_at,
             "tenant_id": tenant_id,
-            "task_id": row.get("task_id"),
-            "recipient_ai": row.get("recipient_ai"),
-            "created_at": payload.get("created_at"),
-        })
+            "task_id": task_id,
+            "recipient_ai": row_recipient_ai,
+            "created_at": created_at,
+        }
 
+
+def search_receipts(
+    db,
+    tenant_id: str,
+    root_task_id: str,
+    phase: str | None = None,
+    recipient_ai: str | None = None,
+    since: str | None = None,
+    limit: int = 100,
+    cursor: Sequence[Any] | None = None,
+) -> dict[str, Any]:
+    receipts = list(
+        iter_search_receipts(
+            db,
+            tenant_id,
+            root_task_id,
+            phase=phase,
+            recipient_ai=recipient_ai,
+            since=since,
+            limit=limit,
+            cursor=cursor,
+        )
+    )
+    next_cursor = None
+    if receipts and len(receipts) == limit:
+        last = receipts[-1]
+        next_cursor = [last["stored_at"], last["receipt_id"]]
     return {
         "tenant_id": tenant_id,
         "root_task_id": root_task_id,
         "receipts": receipts,
+        "next_cursor": next_cursor,
     }
 
 
-def _get_receipt_row(db, tenant_id: str, receipt_id: str) -> dict[str, Any] | None:
-    row = db.execute(
-        text(
-            """
-            SELECT receipt_id, caused_by_receipt_id, stored_at
+@cache
+def _receipt_chain_statement(postgres: bool):
+    # path records the receipts already visited so a caused_by cycle ends the
+    # walk instead of repeating until max_depth: a text[] on Postgres, a
+    # char(31)-delimited string on SQLite (which has no arrays).
+    if postgres:
+        path_seed = "ARRAY[receipt_id]"
+        path_step = "c.path || r.receipt_id"
+        unvisited = "r.receipt_id <> ALL(c.path)"
+    else:
+        path_seed = "char(31) || receipt_id || char(31)"
+        path_step = "c.path || r.receipt_id || char(31)"
+        unvisited = "instr(c.path, char(31) || r.receipt_id || char(31)) = 0"
+    return text(
+        f"""
+        WITH RECURSIVE chain(receipt_id, caused_by_receipt_id, stored_at, depth, path) AS (
+            SELECT receipt_id, caused_by_receipt_id, stored_at, 1, {path_seed}
             FROM receipts_v1
-            WHERE tenant_id = :tenant_id AND receipt_id = :receipt_id
-            """
-        ),
-        {"tenant_id": tenant_id, "receipt_id": receipt_id},
-    ).mappings().first()
-    return dict(row) if row else None
+            WHERE tenant_id = :tenant_id
+              AND receipt_id = :receipt_id
+              AND :max_depth > 0
+            UNION ALL
+            SELECT r.receipt_id, r.caused_by_receipt_id, r.stored_at, c.depth + 1, {path_step}
+            FROM chain c
+            JOIN receipts_v1 r
+              ON r.tenant_id = :tenant_id
+             AND r.receipt_id = c.caused_by_receipt_id
+            WHERE c.caused_by_receipt_id <> 'NA'
+              AND c.depth < :max_depth
+              AND {unvisited}
+        )
+        SELECT receipt_id, caused_by_receipt_id, stored_at
+        FROM chain
+        ORDER BY depth
+        """
+    )
 
 
 def get_receipt_chain(
@@ -343,20 +758,23 @@ def get_receipt_chain(
     receipt_id: str,
     max_depth: int = 2048,
 ) -> dict[str, Any]:
-    chain: list[dict[str, Any]] = []
-    current_id = receipt_id
-    depth = 0
-
-    while current_id and current_id != "NA" and depth < max_depth:
-        row = _get_receipt_row(db, tenant_id, current_id)
-        if not row:
-            break
-        chain.append({
-            "receipt_id": row["receipt_id"],
-            "caused_by_receipt_id": row.get("caused_by_receipt_id") or "NA",
-            "stored_at": row.get("stored_at"),
-        })
-        current_id = row.get("caused_by_receipt_id")
-        depth += 1
+    # One round-trip: the database follows caused_by_receipt_id hop by hop.
+    # Both supported backends (Postgres, and SQLite >= 3.35 as checked at startup
+    # by require_json_support) run WITH RECURSIVE, and a causal chain is linear,
+    # so a layered IN-batch walk would still cost one round-trip per hop; there
+    # is deliberately no such fallback.
+    rows = db.execute(
+        _receipt_chain_statement(_is_postgres(db)),
+        {"tenant_id": tenant_id, "receipt_id": receipt_id, "max_depth": max_depth},
+    )
 
+    # Positional unpacking skips the per-row RowMapping and its key lookups.
+    chain = [
+        {
+            "receipt_id": chain_receipt_id,
+            "caused_by_receipt_id": caused_by_receipt_id or "NA",
+            "stored_at": stored_at,
+        }
+        for chain_receipt_id, caused_by_receipt_id, stored_at in rows
+    ]
     return {"root_receipt_id": receipt_id, "chain": chain}
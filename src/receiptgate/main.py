@@ -4,16 +4,18 @@ from __future__ import annotations
 
 from contextlib import asynccontextmanager
 
+import orjson
 import uvicorn
-from fastapi import FastAPI, Request
+from fastapi import FastAPI, Request, Response
 from fastapi.exceptions import RequestValidationError
-from fastapi.responses import JSONResponse
 
 from receiptgate import __version__
 from receiptgate.config import settings
 from receiptgate.db import init_db
 from receiptgate.middleware import configure_middleware
 from receiptgate.mcp.routes import router as mcp_router
+from receiptgate.responses import ORJSONResponse
+from receiptgate.validation_v1 import preload_schema
 
 
 @asynccontextmanager
@@ -28,10 +30,19 @@ def create_app() -> FastAPI:
         description="Canonical receipt ledger for obligation truth (MemoryGate profile)",
         version=__version__,
         lifespan=lifespan,
+        default_response_class=ORJSONResponse,
     )
 
     configure_middleware(app)
     app.include_router(mcp_router)
+    preload_schema()
+
+    # Probe endpoint: no auth dependency, body encoded once per app.
+    health_body = orjson.dumps({"ok": True, "service": settings.service_name})
+
+    @app.get("/health", include_in_schema=False)
+    async def health() -> Response:
+        return Response(content=health_body, media_type="application/json")
 
     @app.exception_handler(RequestValidationError)
     async def validation_exception_handler(_request: Request, exc: RequestValidationError):
@@ -43,7 +54,7 @@ def create_app() -> FastAPI:
                 "details": {"errors": exc.errors()},
             },
         }
-        return JSONResponse(status_code=422, content=payload)
+        return ORJSONResponse(status_code=422, content=payload)
 
     return app
 
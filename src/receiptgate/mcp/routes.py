@@ -2,25 +2,35 @@
 
 from __future__ import annotations
 
+from collections.abc import Callable, Iterator
+from datetime import datetime
 from typing import Any
 
-from fastapi import APIRouter, Depends, Request
-from pydantic import BaseModel, Field
+import orjson
+from fastapi import APIRouter, Depends, Request, Response
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field, ValidationError
+from starlette.concurrency import run_in_threadpool
 
 from receiptgate import __version__
 from receiptgate.auth import verify_api_key
 from receiptgate.config import receiptgate_clock, settings
-from receiptgate.db import get_db_session
+from receiptgate.db import current_session
 from receiptgate.ledger_v1 import (
     ReceiptConflictError,
     get_receipt,
     get_receipt_chain,
+    iter_search_receipts,
+    iter_task_receipts,
     list_inbox,
     list_task_receipts,
     put_receipt,
+    put_receipts,
     search_receipts,
 )
-from receiptgate.validation_v1 import apply_server_fields, validate_receipt_payload
+from receiptgate.responses import ORJSONResponse
+from receiptgate.validation_v1 import apply_server_fields_inplace, validate_receipt_payload
 
 
 class MCPRequest(BaseModel):
@@ -49,6 +59,21 @@ MCP_TOOLS = [
             "required": ["receipt"],
         },
     },
+    {
+        "name": "receiptgate.submit_receipts_batch",
+        "description": "Store several receipts in one transaction",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "receipts": {
+                    "type": "array",
+                    "items": {"type": "object"},
+                    "description": "Receipt payloads",
+                },
+            },
+            "required": ["receipts"],
+        },
+    },
     {
         "name": "receiptgate.list_inbox",
         "description": "Retrieve active obligations for an agent",
@@ -83,6 +108,7 @@ MCP_TOOLS = [
                 "sort": {"type": "string", "enum": ["asc", "desc"]},
                 "include_payload": {"type": "boolean"},
                 "limit": {"type": "integer"},
+                "stream": {"type": "boolean", "description": "Stream the response row by row"},
             },
             "required": ["task_id"],
         },
@@ -98,6 +124,14 @@ MCP_TOOLS = [
                 "recipient_ai": {"type": "string"},
                 "since": {"type": "string", "description": "ISO timestamp"},
                 "limit": {"type": "integer"},
+                "cursor": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "minItems": 2,
+                    "maxItems": 2,
+                    "description": "next_cursor from the previous page",
+                },
+                "stream": {"type": "boolean", "description": "Stream the response row by row"},
             },
             "required": ["root_task_id"],
         },
@@ -127,25 +161,380 @@ MCP_TOOLS = [
 ]
 
 
-def _jsonrpc_result(request_id: Any, result: Any) -> dict[str, Any]:
-    return {"jsonrpc": "2.0", "id": request_id, "result": result}
+# MCP_TOOLS is static: encode the tools/list result once and splice it into each envelope.
+_TOOLS_LIST_RESULT_BYTES = orjson.dumps({"tools": MCP_TOOLS})
+
+
+def _tools_list_response(request_id: Any) -> Response:
+    content = b'{"jsonrpc":"2.0","id":%b,"result":%b}' % (
+        orjson.dumps(request_id),
+        _TOOLS_LIST_RESULT_BYTES,
+    )
+    return Response(content=content, media_type="application/json")
+
 
+# Envelopes are returned as responses so FastAPI skips jsonable_encoder.
+def _jsonrpc_result(request_id: Any, result: Any) -> ORJSONResponse:
+    return ORJSONResponse({"jsonrpc": "2.0", "id": request_id, "result": result})
 
-def _jsonrpc_error(request_id: Any, code: Any, message: str, details: Any | None = None) -> dict[str, Any]:
+
+def _jsonrpc_error(request_id: Any, code: Any, message: str, details: Any | None = None) -> ORJSONResponse:
     error: dict[str, Any] = {"code": code, "message": message}
     if details is not None:
         error["details"] = details
-    return {"jsonrpc": "2.0", "id": request_id, "error": error}
+    return ORJSONResponse({"jsonrpc": "2.0", "id": request_id, "error": error})
+
+
+def _jsonrpc_stream(
+    request_id: Any,
+    header: dict[str, Any],
+    receipts: Iterator[dict[str, Any]],
+    page_limit: int | None = None,
+) -> StreamingResponse:
+    """
+    Stream a result of the form {**header, "receipts": [...]} one encoded row at a time.
+
+    With page_limit set, a "next_cursor" trailer is appended as search_receipts builds it.
+    """
+
+    def body() -> Iterator[bytes]:
+        yield b'{"jsonrpc":"2.0","id":%b,"result":%b,"receipts":[' % (
+            orjson.dumps(request_id),
+            orjson.dumps(header)[:-1],
+        )
+        separator = b""
+        count = 0
+        last: dict[str, Any] | None = None
+        for entry in receipts:
+            yield separator + orjson.dumps(entry)
+            separator = b","
+            count += 1
+            last = entry
+        if page_limit is None:
+            yield b"]}}"
+            return
+        next_cursor = None
+        if last is not None and count == page_limit:
+            next_cursor = [last["stored_at"], last["receipt_id"]]
+        yield b'],"next_cursor":%b}}' % orjson.dumps(next_cursor)
+
+    return StreamingResponse(body(), media_type="application/json")
+
+
+def _tool_health(request_id: Any, tenant_id: str, arguments: dict[str, Any]) -> Response:
+    return _jsonrpc_result(
+        request_id,
+        {
+            "status": "healthy",
+            "service": "ReceiptGate",
+            "version": __version__,
+            "instance_id": settings.service_name,
+        },
+    )
+
+
+def _tool_submit_receipt(request_id: Any, tenant_id: str, arguments: dict[str, Any]) -> Response:
+    # The envelope was parsed for this request, so its receipt dict is ours to update.
+    receipt = arguments.get("receipt") or {}
+    stored_at = receiptgate_clock()
+    payload = apply_server_fields_inplace(receipt, tenant_id=tenant_id, stored_at=stored_at)
+    errors = validate_receipt_payload(payload)
+    if errors:
+        return _jsonrpc_error(request_id, "validation_failed", "Receipt validation failed", errors)
+
+    try:
+        result = put_receipt(current_session(), payload, tenant_id)
+    except ReceiptConflictError as exc:
+        return _jsonrpc_error(
+            request_id,
+            "RECEIPT_ID_COLLISION",
+            "receipt_id collision with different canonical hash",
+            {
+                "receipt_id": exc.receipt_id,
+                "existing_hash": exc.existing_hash,
+                "incoming_hash": exc.incoming_hash,
+            },
+        )
+    except Exception as exc:
+        return _jsonrpc_error(
+            request_id,
+            "receiptgate_error",
+            "Failed to store receipt",
+            {"error": str(exc)},
+        )
+    return _jsonrpc_result(request_id, result)
+
+
+def _tool_submit_receipts_batch(
+    request_id: Any,
+    tenant_id: str,
+    arguments: dict[str, Any],
+) -> Response:
+    receipts = arguments.get("receipts")
+    if not isinstance(receipts, list) or not receipts:
+        return _jsonrpc_error(request_id, "validation_failed", "receipts must be a non-empty list")
+    if len(receipts) > settings.receipt_batch_max_size:
+        return _jsonrpc_error(
+            request_id,
+            "validation_failed",
+            f"At most {settings.receipt_batch_max_size} receipts per batch",
+        )
+    stored_at = receiptgate_clock()
+    payloads = []
+    batch_errors = []
+    for index, receipt in enumerate(receipts):
+        if not isinstance(receipt, dict):
+            batch_errors.append({
+                "index": index,
+                "errors": [{
+                    "field": "receipt",
+                    "constraint": "type",
+                    "message": "receipt must be an object",
+                }],
+            })
+            continue
+        payload = apply_server_fields_inplace(receipt, tenant_id=tenant_id, stored_at=stored_at)
+        errors = validate_receipt_payload(payload)
+        if errors:
+            batch_errors.append({"index": index, "errors": errors})
+        payloads.append(payload)
+    if batch_errors:
+        return _jsonrpc_error(
+            request_id,
+            "validation_failed",
+            "Receipt validation failed",
+            batch_errors,
+        )
+
+    try:
+        results = put_receipts(current_session(), payloads, tenant_id)
+    except ReceiptConflictError as exc:
+        return _jsonrpc_error(
+            request_id,
+            "RECEIPT_ID_COLLISION",
+            "receipt_id collision with different canonical hash",
+            {
+                "receipt_id": exc.receipt_id,
+                "existing_hash": exc.existing_hash,
+                "incoming_hash": exc.incoming_hash,
+            },
+        )
+    except Exception as exc:
+        return _jsonrpc_error(
+            request_id,
+            "receiptgate_error",
+            "Failed to store receipts",
+            {"error": str(exc)},
+        )
+    return _jsonrpc_result(request_id, {"count": len(results), "receipts": results})
+
+
+def _tool_list_inbox(request_id: Any, tenant_id: str, arguments: dict[str, Any]) -> Response:
+    recipient_ai = arguments.get("recipient_ai")
+    if not recipient_ai:
+        return _jsonrpc_error(request_id, "validation_failed", "recipient_ai is required")
+    limit = int(arguments.get("limit") or settings.search_default_limit)
+    return _jsonrpc_result(
+        request_id,
+        list_inbox(current_session(), tenant_id, recipient_ai, limit),
+    )
+
+
+def _tool_bootstrap(request_id: Any, tenant_id: str, arguments: dict[str, Any]) -> Response:
+    agent_name = arguments.get("agent_name")
+    session_id = arguments.get("session_id")
+    if not agent_name or not session_id:
+        return _jsonrpc_error(
+            request_id,
+            "validation_failed",
+            "agent_name and session_id are required",
+        )
+    inbox = list_inbox(current_session(), tenant_id, agent_name, settings.search_default_limit)
+    return _jsonrpc_result(
+        request_id,
+        {
+            "tenant_id": tenant_id,
+            "agent_name": agent_name,
+            "session_id": session_id,
+            "config": {
+                "receipt_schema_version": "1.0",
+                "receiptgate_url": settings.public_url,
+                "capabilities": ["receipts", "audit"],
+            },
+            "inbox": inbox,
+            "recent_context": {
+                "last_10_receipts": [],
+                "recent_patterns": [],
+            },
+        },
+    )
+
+
+def _tool_list_task_receipts(
+    request_id: Any,
+    tenant_id: str,
+    arguments: dict[str, Any],
+) -> Response:
+    task_id = arguments.get("task_id")
+    if not task_id:
+        return _jsonrpc_error(request_id, "validation_failed", "task_id is required")
+    sort = arguments.get("sort", "asc")
+    include_payload = bool(arguments.get("include_payload", False))
+    limit = arguments.get("limit")
+    if arguments.get("stream"):
+        return _jsonrpc_stream(
+            request_id,
+            {"tenant_id": tenant_id, "task_id": task_id},
+            iter_task_receipts(
+                current_session(),
+                tenant_id,
+                task_id,
+                sort,
+                include_payload,
+                limit,
+                stream=True,
+            ),
+        )
+    return _jsonrpc_result(
+        request_id,
+        list_task_receipts(current_session(), tenant_id, task_id, sort, include_payload, limit),
+    )
+
+
+def _is_search_cursor(cursor: Any) -> bool:
+    """True for a [stored_at, receipt_id] pair as returned in next_cursor."""
+    if not isinstance(cursor, list) or len(cursor) != 2:
+        return False
+    stored_at, receipt_id = cursor
+    if not isinstance(stored_at, str) or not isinstance(receipt_id, str):
+        return False
+    try:
+        datetime.fromisoformat(stored_at)
+    except ValueError:
+        return False
+    return True
+
+
+def _tool_search_receipts(request_id: Any, tenant_id: str, arguments: dict[str, Any]) -> Response:
+    root_task_id = arguments.get("root_task_id")
+    if not root_task_id:
+        return _jsonrpc_error(request_id, "validation_failed", "root_task_id is required")
+    phase = arguments.get("phase")
+    recipient_ai = arguments.get("recipient_ai")
+    since = arguments.get("since")
+    limit = int(arguments.get("limit") or settings.search_default_limit)
+    cursor = arguments.get("cursor")
+    if cursor is not None and not _is_search_cursor(cursor):
+        return _jsonrpc_error(
+            request_id,
+            "validation_failed",
+            "cursor must be [stored_at, receipt_id]",
+        )
+    if arguments.get("stream"):
+        return _jsonrpc_stream(
+            request_id,
+            {"tenant_id": tenant_id, "root_task_id": root_task_id},
+            iter_search_receipts(
+                current_session(),
+                tenant_id,
+                root_task_id,
+                phase=phase,
+                recipient_ai=recipient_ai,
+                since=since,
+                limit=limit,
+                stream=True,
+                cursor=cursor,
+            ),
+            page_limit=limit,
+        )
+    return _jsonrpc_result(
+        request_id,
+        search_receipts(
+            current_session(),
+            tenant_id,
+            root_task_id,
+            phase=phase,
+            recipient_ai=recipient_ai,
+            since=since,
+            limit=limit,
+            cursor=cursor,
+        ),
+    )
+
+
+def _tool_get_receipt_chain(request_id: Any, tenant_id: str, arguments: dict[str, Any]) -> Response:
+    receipt_id = arguments.get("receipt_id")
+    if not receipt_id:
+        return _jsonrpc_error(request_id, "validation_failed", "receipt_id is required")
+    return _jsonrpc_result(
+        request_id,
+        get_receipt_chain(
+            current_session(),
+            tenant_id,
+            receipt_id,
+            settings.receipt_chain_max_depth,
+        ),
+    )
+
+
+def _tool_get_receipt(request_id: Any, tenant_id: str, arguments: dict[str, Any]) -> Response:
+    receipt_id = arguments.get("receipt_id")
+    if not receipt_id:
+        return _jsonrpc_error(request_id, "validation_failed", "receipt_id is required")
+    payload = get_receipt(current_session(), tenant_id, receipt_id)
+    if payload is None:
+        return _jsonrpc_error(request_id, "not_found", "Receipt not found")
+    return _jsonrpc_result(request_id, payload)
+
+
+TOOL_DISPATCH: dict[str, Callable[[Any, str, dict[str, Any]], Response]] = {
+    "receiptgate.health": _tool_health,
+    "receiptgate.submit_receipt": _tool_submit_receipt,
+    "receiptgate.submit_receipts_batch": _tool_submit_receipts_batch,
+    "receiptgate.list_inbox": _tool_list_inbox,
+    "receiptgate.bootstrap": _tool_bootstrap,
+    "receiptgate.list_task_receipts": _tool_list_task_receipts,
+    "receiptgate.search_receipts": _tool_search_receipts,
+    "receiptgate.get_receipt_chain": _tool_get_receipt_chain,
+    "receiptgate.get_receipt": _tool_get_receipt,
+}
 
 
 router = APIRouter(prefix="/mcp", tags=["mcp"], dependencies=[Depends(verify_api_key)])
 
 
-@router.post("")
-async def mcp_entry(request: MCPRequest, http_request: Request):
+async def _read_envelope(http_request: Request) -> MCPRequest:
+    # Validate straight from the raw bytes: pydantic-core parses and validates in
+    # one pass instead of FastAPI decoding to Python objects first.
+    raw = await http_request.body()
+    try:
+        return MCPRequest.model_validate_json(raw)
+    except ValidationError as exc:
+        errors = []
+        for error in exc.errors(include_url=False, include_context=False):
+            error["loc"] = ("body", *error["loc"])
+            if isinstance(error.get("input"), bytes):
+                # Malformed JSON reports the raw body as its input.
+                error["input"] = error["input"].decode("utf-8", "replace")
+            errors.append(error)
+        raise RequestValidationError(errors, body=raw) from None
+
+
+@router.post(
+    "",
+    response_class=ORJSONResponse,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {"application/json": {"schema": MCPRequest.model_json_schema()}},
+        },
+    },
+)
+async def mcp_entry(http_request: Request) -> Response:
     """Handle MCP JSON-RPC requests."""
+    request = await _read_envelope(http_request)
     if request.method == "tools/list":
-        return _jsonrpc_result(request.id, {"tools": MCP_TOOLS})
+        return _tools_list_response(request.id)
 
     if request.method != "tools/call":
         return _jsonrpc_error(request.id, -32601, f"Method not found: {request.method}")
@@ -156,134 +545,10 @@ async def mcp_entry(request: MCPRequest, http_request: Request):
     if not tool_name:
         return _jsonrpc_error(request.id, -32602, "Missing tool name")
 
-    db = next(get_db_session())
-    tenant_id = settings.default_tenant_id
-
-    try:
-        if tool_name == "receiptgate.health":
-            return _jsonrpc_result(
-                request.id,
-                {
-                    "status": "healthy",
-                    "service": "ReceiptGate",
-                    "version": __version__,
-                    "instance_id": settings.service_name,
-                },
-            )
-
-        if tool_name == "receiptgate.submit_receipt":
-            receipt = arguments.get("receipt") or {}
-            stored_at = receiptgate_clock()
-            payload = apply_server_fields(receipt, tenant_id=tenant_id, stored_at=stored_at)
-            errors = validate_receipt_payload(payload)
-            if errors:
-                return _jsonrpc_error(request.id, "validation_failed", "Receipt validation failed", errors)
-
-            try:
-                result = put_receipt(db, payload, tenant_id)
-            except ReceiptConflictError as exc:
-                return _jsonrpc_error(
-                    request.id,
-                    "RECEIPT_ID_COLLISION",
-                    "receipt_id collision with different canonical hash",
-                    {
-                        "receipt_id": exc.receipt_id,
-                        "existing_hash": exc.existing_hash,
-                        "incoming_hash": exc.incoming_hash,
-                    },
-                )
-            except Exception as exc:
-                return _jsonrpc_error(
-                    request.id,
-                    "receiptgate_error",
-                    "Failed to store receipt",
-                    {"error": str(exc)},
-                )
-            return _jsonrpc_result(request.id, result)
-
-        if tool_name == "receiptgate.list_inbox":
-            recipient_ai = arguments.get("recipient_ai")
-            if not recipient_ai:
-                return _jsonrpc_error(request.id, "validation_failed", "recipient_ai is required")
-            limit = int(arguments.get("limit") or settings.search_default_limit)
-            return _jsonrpc_result(request.id, list_inbox(db, tenant_id, recipient_ai, limit))
-
-        if tool_name == "receiptgate.bootstrap":
-            agent_name = arguments.get("agent_name")
-            session_id = arguments.get("session_id")
-            if not agent_name or not session_id:
-                return _jsonrpc_error(request.id, "validation_failed", "agent_name and session_id are required")
-            inbox = list_inbox(db, tenant_id, agent_name, settings.search_default_limit)
-            return _jsonrpc_result(
-                request.id,
-                {
-                    "tenant_id": tenant_id,
-                    "agent_name": agent_name,
-                    "session_id": session_id,
-                    "config": {
-                        "receipt_schema_version": "1.0",
-                        "receiptgate_url": settings.public_url,
-                        "capabilities": ["receipts", "audit"],
-                    },
-                    "inbox": inbox,
-                    "recent_context": {
-                        "last_10_receipts": [],
-                        "recent_patterns": [],
-                    },
-                },
-            )
-
-        if tool_name == "receiptgate.list_task_receipts":
-            task_id = arguments.get("task_id")
-            if not task_id:
-                return _jsonrpc_error(request.id, "validation_failed", "task_id is required")
-            sort = arguments.get("sort", "asc")
-            include_payload = bool(arguments.get("include_payload", False))
-            limit = arguments.get("limit")
-            return _jsonrpc_result(
-                request.id,
-                list_task_receipts(db, tenant_id, task_id, sort, include_payload, limit),
-            )
-
-        if tool_name == "receiptgate.search_receipts":
-            root_task_id = arguments.get("root_task_id")
-            if not root_task_id:
-                return _jsonrpc_error(request.id, "validation_failed", "root_task_id is required")
-            phase = arguments.get("phase")
-            recipient_ai = arguments.get("recipient_ai")
-            since = arguments.get("since")
-            limit = int(arguments.get("limit") or settings.search_default_limit)
-            return _jsonrpc_result(
-                request.id,
-                search_receipts(
-                    db,
-                    tenant_id,
-                    root_task_id,
-                    phase=phase,
-                    recipient_ai=recipient_ai,
-                    since=since,
-                    limit=limit,
-                ),
-            )
-
-        if tool_name == "receiptgate.get_receipt_chain":
-            receipt_id = arguments.get("receipt_id")
-            if not receipt_id:
-                return _jsonrpc_error(request.id, "validation_failed", "receipt_id is required")
-            return _jsonrpc_result(
-                request.id,
-                get_receipt_chain(db, tenant_id, receipt_id, settings.receipt_chain_max_depth),
-            )
-
-        if tool_name == "receiptgate.get_receipt":
-            receipt_id = arguments.get("receipt_id")
-            if not receipt_id:
-                return _jsonrpc_error(request.id, "validation_failed", "receipt_id is required")
-            payload = get_receipt(db, tenant_id, receipt_id)
-            if payload is None:
-                return _jsonrpc_error(request.id, "not_found", "Receipt not found")
-            return _jsonrpc_result(request.id, payload)
-
+    handler = TOOL_DISPATCH.get(tool_name)
+    if handler is None:
         return _jsonrpc_error(request.id, "unknown_tool", f"Unknown tool: {tool_name}")
-    finally:
-        db.close()
+    # Handlers do blocking DB work (a submit waits on its commit); run them in the
+    # threadpool so the event loop keeps serving other requests meanwhile. The
+    # write itself stays synchronous: a receipt is acknowledged only once durable.
+    return await run_in_threadpool(handler, request.id, settings.default_tenant_id, arguments)
@@ -6,6 +6,7 @@ from fastapi.middleware.cors import CORSMiddleware
 from starlette.middleware.trustedhost import TrustedHostMiddleware
 
 from receiptgate.config import settings
+from receiptgate.db import DBSessionMiddleware
 from receiptgate.rate_limiter import (
     RateLimitMiddleware,
     build_rate_limiter_from_env,
@@ -20,7 +21,7 @@ from receiptgate.security_middleware import (
 
 
 def configure_middleware(app):
-    """Configure security, rate limiting, and CORS middleware for ReceiptGate."""
+    """Configure DB session scoping, security, rate limiting, and CORS middleware."""
     rate_limit_config = load_rate_limit_config_from_env()
     rate_limiter = build_rate_limiter_from_env(rate_limit_config)
 
@@ -30,6 +31,8 @@ def configure_middleware(app):
     )
     security_headers_config = load_security_headers_config_from_env()
 
+    app.add_middleware(DBSessionMiddleware)
+
     app.add_middleware(
         RequestSizeLimitMiddleware,
         config=request_size_config,
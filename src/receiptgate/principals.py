@@ -4,6 +4,12 @@ SYSTEM_PRINCIPAL_ID = "sys:legivellum"
 SERVICE_PRINCIPAL_ID = "svc:receiptgate"
 INTERNAL_PRINCIPAL_PREFIXES = ("sys:", "svc:")
 
+# All internal prefixes share one length, so a single slice + set lookup decides.
+_PREFIX_LENGTH = len(INTERNAL_PRINCIPAL_PREFIXES[0])
+_INTERNAL_PREFIX_SET = frozenset(INTERNAL_PRINCIPAL_PREFIXES)
+if any(len(prefix) != _PREFIX_LENGTH for prefix in INTERNAL_PRINCIPAL_PREFIXES):
+    raise RuntimeError("INTERNAL_PRINCIPAL_PREFIXES must all have the same length")
+
 
 def is_internal_principal(principal_id: str) -> bool:
-    return principal_id.startswith(INTERNAL_PRINCIPAL_PREFIXES)
+    return principal_id[:_PREFIX_LENGTH] in _INTERNAL_PREFIX_SET
@@ -7,12 +7,18 @@ Ported from MemoryGate for consistent behavior.
 from __future__ import annotations
 
 import asyncio
-import json
 import logging
 import os
+import re
 import time
-from dataclasses import dataclass
-from typing import Dict, Optional, Tuple
+from collections import OrderedDict
+from collections.abc import AsyncIterator, Iterator, Sequence
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Generic, TypeVar
+from uuid import uuid4
+
+import orjson
 
 try:
     import redis.asyncio as redis_async
@@ -21,14 +27,21 @@ except Exception:
 
 logger = logging.getLogger("receiptgate.rate_limit")
 
+_NS_PER_SECOND = 1_000_000_000
+
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class RateLimitRule:
     limit: int
     window_seconds: int
+    # Derived so the limiters can bucket time.time_ns() with integer math only.
+    window_ns: int = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "window_ns", self.window_seconds * _NS_PER_SECOND)
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class RateLimitConfig:
     enabled: bool
     global_ip: RateLimitRule
@@ -36,11 +49,20 @@ class RateLimitConfig:
     auth_ip: RateLimitRule
     max_cache_entries: int
     trusted_proxy_count: int
-    trusted_proxy_ips: Tuple[str, ...]
+    trusted_proxy_ips: tuple[str, ...]
     redis_fail_open: bool
+    # Requests one client IP may have in flight at once; 0 disables the check.
+    concurrent_per_ip: int = 0
+    # How long a Redis slot survives if the worker holding it dies.
+    concurrent_ttl_seconds: int = 60
+    # Derived from trusted_proxy_ips for O(1) membership checks per request.
+    trusted_proxy_ip_set: frozenset[str] = field(init=False, repr=False, compare=False)
 
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "trusted_proxy_ip_set", frozenset(self.trusted_proxy_ips))
 
-@dataclass(frozen=True)
+
+@dataclass(frozen=True, slots=True)
 class RateLimitResult:
     allowed: bool
     remaining: int
@@ -76,6 +98,8 @@ def load_rate_limit_config_from_env() -> RateLimitConfig:
     max_cache_entries = _get_int("RATE_LIMIT_MAX_CACHE_ENTRIES", 10000)
     trusted_proxy_count = _get_int("RATE_LIMIT_TRUSTED_PROXY_COUNT", 0)
     redis_fail_open = _get_bool("RATE_LIMIT_REDIS_FAIL_OPEN", True)
+    concurrent_per_ip = _get_int("RATE_LIMIT_CONCURRENT_PER_IP", 0)
+    concurrent_ttl_seconds = _get_int("RATE_LIMIT_CONCURRENT_TTL_SECONDS", 60)
     trusted_proxy_ips = tuple(
         ip.strip()
         for ip in os.environ.get("RATE_LIMIT_TRUSTED_PROXY_IPS", "").split(",")
@@ -91,6 +115,8 @@ def load_rate_limit_config_from_env() -> RateLimitConfig:
         trusted_proxy_count=trusted_proxy_count,
         trusted_proxy_ips=trusted_proxy_ips,
         redis_fail_open=redis_fail_open,
+        concurrent_per_ip=concurrent_per_ip,
+        concurrent_ttl_seconds=concurrent_ttl_seconds,
     )
 
 
@@ -98,90 +124,515 @@ class RateLimiter:
     async def allow(self, key: str, rule: RateLimitRule) -> RateLimitResult:
         raise NotImplementedError
 
+    async def allow_many(
+        self, specs: Sequence[tuple[str, RateLimitRule]]
+    ) -> list[RateLimitResult]:
+        """
+        Count one hit against each (key, rule) pair in priority order.
+
+        Stops at the first denied rule, so a rejected request is never charged
+        to the lower-priority keys after it; the results end at that rule.
+        """
+        results: list[RateLimitResult] = []
+        for key, rule in specs:
+            result = await self.allow(key, rule)
+            results.append(result)
+            if not result.allowed:
+                break
+        return results
+
+    @asynccontextmanager
+    async def concurrent_slot(
+        self, key: str, limit: int, ttl_seconds: int
+    ) -> AsyncIterator[bool]:
+        """
+        Hold one of ``limit`` in-flight slots for ``key`` while the block runs.
+
+        Yields False, without taking a slot, when all of them are in use.
+        """
+        yield True
+
     async def close(self) -> None:
         return None
 
 
+_V = TypeVar("_V")
+
+_MASK64 = (1 << 64) - 1
+_SKETCH_SEEDS = (
+    0x9E3779B97F4A7C15,
+    0xC2B2AE3D27D4EB4F,
+    0x165667B19E3779F9,
+    0xD6E8FEB86659FD93,
+)
+_HALVE = bytes(value >> 1 for value in range(256))
+
+
+class _FrequencySketch:
+    """
+    Count-Min Sketch of recent key frequencies with 4-bit saturating counters.
+
+    Counters are halved every ``10 * capacity`` increments so the estimate
+    favours recent popularity over all-time totals.
+    """
+
+    def __init__(self, capacity: int):
+        width = 1 << max(4, (4 * capacity - 1).bit_length())
+        self._shift = 64 - (width.bit_length() - 1)
+        self._rows = [bytearray(width) for _ in _SKETCH_SEEDS]
+        self._sample_size = 10 * max(1, capacity)
+        self._additions = 0
+
+    def _indexes(self, key: str) -> Iterator[int]:
+        spread = hash(key) & _MASK64
+        for seed in _SKETCH_SEEDS:
+            yield ((spread * seed) & _MASK64) >> self._shift
+
+    def increment(self, key: str) -> None:
+        for row, index in zip(self._rows, self._indexes(key)):
+            if row[index] < 15:
+                row[index] += 1
+        self._additions += 1
+        if self._additions >= self._sample_size:
+            for row in self._rows:
+                row[:] = row.translate(_HALVE)
+            self._additions //= 2
+
+    def frequency(self, key: str) -> int:
+        return min(row[index] for row, index in zip(self._rows, self._indexes(key)))
+
+
+class _TinyLFUCache(Generic[_V]):
+    """
+    Bounded map with W-TinyLFU eviction, as used by Caffeine.
+
+    New keys enter a small LRU window (~1% of capacity). Keys leaving the
+    window only displace an entry of the segmented main LRU (20% probation,
+    80% protected) when the sketch says they are requested more often, so a
+    scan of one-off keys cannot flush counters for frequently seen ones.
+    """
+
+    def __init__(self, capacity: int):
+        capacity = max(1, capacity)
+        self._window_capacity = max(1, capacity // 100)
+        self._main_capacity = capacity - self._window_capacity
+        self._protected_capacity = int(self._main_capacity * 0.8)
+        self._window: OrderedDict[str, _V] = OrderedDict()
+        self._probation: OrderedDict[str, _V] = OrderedDict()
+        self._protected: OrderedDict[str, _V] = OrderedDict()
+        self._sketch = _FrequencySketch(capacity)
+
+    def __len__(self) -> int:
+        return len(self._window) + len(self._probation) + len(self._protected)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._window or key in self._probation or key in self._protected
+
+    def get(self, key: str, default: _V) -> _V:
+        """Record an access to ``key`` and return its value, or ``default``."""
+        self._sketch.increment(key)
+        if key in self._window:
+            self._window.move_to_end(key)
+            return self._window[key]
+        if key in self._protected:
+            self._protected.move_to_end(key)
+            return self._protected[key]
+        if key in self._probation:
+            value = self._protected[key] = self._probation.pop(key)
+            if len(self._protected) > self._protected_capacity:
+                demoted, demoted_value = self._protected.popitem(last=False)
+                self._probation[demoted] = demoted_value
+            return value
+        return default
+
+    def set(self, key: str, value: _V) -> None:
+        for segment in (self._window, self._protected, self._probation):
+            if key in segment:
+                segment[key] = value
+                return
+        self._window[key] = value
+        if len(self._window) > self._window_capacity:
+            self._admit(*self._window.popitem(last=False))
+
+    def _admit(self, candidate: str, value: _V) -> None:
+        if len(self._probation) + len(self._protected) < self._main_capacity:
+            self._probation[candidate] = value
+            return
+        segment = self._probation or self._protected
+        if not segment:
+            return
+        victim = next(iter(segment))
+        if self._sketch.frequency(candidate) > self._sketch.frequency(victim):
+            del segment[victim]
+            self._probation[candidate] = value
+
+
+class _ShardedCache(Generic[_V]):
+    """
+    Splits keys by hash across up to 64 independent W-TinyLFU caches.
+
+    Each shard stays small, so growth under a burst of new keys resizes many
+    small dicts a little at a time instead of one large dict at once.
+    """
+
+    _MAX_SHARDS = 64
+    # Shards are only added while each keeps at least this many entries, so
+    # per-shard admission still has enough history to be useful.
+    _MIN_SHARD_ENTRIES = 64
+
+    def __init__(self, capacity: int):
+        capacity = max(1, capacity)
+        shards = 1
+        while shards < self._MAX_SHARDS and capacity // (shards * 2) >= self._MIN_SHARD_ENTRIES:
+            shards *= 2
+        self._mask = shards - 1
+        self._shards: list[_TinyLFUCache[_V]] = [
+            _TinyLFUCache(capacity // shards) for _ in range(shards)
+        ]
+
+    def __len__(self) -> int:
+        return sum(len(shard) for shard in self._shards)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._shards[hash(key) & self._mask]
+
+    def get(self, key: str, default: _V) -> _V:
+        return self._shards[hash(key) & self._mask].get(key, default)
+
+    def set(self, key: str, value: _V) -> None:
+        self._shards[hash(key) & self._mask].set(key, value)
+
+
 class InMemoryRateLimiter(RateLimiter):
+    """
+    Fixed-window counters held in process memory.
+
+    Not thread-safe: it relies on running on a single event loop. ``allow``
+    never awaits between reading and writing a counter, so each update is
+    atomic with respect to other coroutines and needs no lock.
+
+    At most ``max_entries`` counters are kept, evicted by W-TinyLFU so that
+    bursts of one-off client IPs do not push out counters for busy clients.
+    """
+
     def __init__(self, max_entries: int = 10000):
-        self._lock = asyncio.Lock()
-        self._counters: Dict[str, Tuple[int, float]] = {}
-        self._max_entries = max_entries
-        self._last_sweep = 0.0
+        # Values are (count, window reset in epoch nanoseconds).
+        self._counters: _ShardedCache[tuple[int, int]] = _ShardedCache(max_entries)
+        # Only keys with requests in flight are present, so this needs no cap.
+        self._in_flight: dict[str, int] = {}
 
     async def allow(self, key: str, rule: RateLimitRule) -> RateLimitResult:
-        now = time.time()
-        window_start = int(now // rule.window_seconds) * rule.window_seconds
-        reset = window_start + rule.window_seconds
-
-        async with self._lock:
-            count, stored_reset = self._counters.get(key, (0, reset))
-            if stored_reset <= now:
-                count = 0
-                stored_reset = reset
-
-            count += 1
-            self._counters[key] = (count, stored_reset)
-
-            if (
-                len(self._counters) > self._max_entries
-                and (now - self._last_sweep) > rule.window_seconds
-            ):
-                self._sweep(now)
-                self._last_sweep = now
+        now_ns = time.time_ns()
+        window_ns = rule.window_ns
+        reset_ns = (now_ns // window_ns) * window_ns + window_ns
+
+        count, stored_reset_ns = self._counters.get(key, (0, reset_ns))
+        if stored_reset_ns <= now_ns:
+            count = 0
+            stored_reset_ns = reset_ns
+
+        count += 1
+        self._counters.set(key, (count, stored_reset_ns))
 
         remaining = max(0, rule.limit - count)
         return RateLimitResult(
             allowed=count <= rule.limit,
             remaining=remaining,
-            reset_epoch=int(stored_reset),
+            reset_epoch=stored_reset_ns // _NS_PER_SECOND,
             limit=rule.limit,
         )
 
-    def _sweep(self, now: float) -> None:
-        expired = [key for key, (_, reset) in self._counters.items() if reset <= now]
-        for key in expired:
-            self._counters.pop(key, None)
+    @asynccontextmanager
+    async def concurrent_slot(
+        self, key: str, limit: int, ttl_seconds: int
+    ) -> AsyncIterator[bool]:
+        in_flight = self._in_flight.get(key, 0)
+        if in_flight >= limit:
+            yield False
+            return
+        self._in_flight[key] = in_flight + 1
+        try:
+            yield True
+        finally:
+            remaining = self._in_flight[key] - 1
+            if remaining:
+                self._in_flight[key] = remaining
+            else:
+                del self._in_flight[key]
+
+
+# Count a request against each rule in priority order in one round trip, and
+# stop at the first rule that denies it so later keys are not charged for a
+# rejected request. INCRBY and the window expiry are atomic; EXPIREAT only runs
+# when the key is created. The window is taken from the Redis server clock so
+# every app instance agrees on boundaries regardless of local clock skew.
+# KEYS are the counters' base keys; each has four ARGV entries: the window
+# length in seconds, the limit, the hits to reserve and the lease ceiling.
+# More than one hit is only reserved while the count stays within the
+# ceiling; past it each request counts a single hit. Returns one
+# {count, reset_epoch, hits} per rule evaluated.
+#
+# The per-window keys are built inside the script, which Redis Cluster does
+# not allow for undeclared keys; the limiter targets a single Redis instance.
+_CHECK_WINDOWS_SCRIPT = """
+local now = tonumber(redis.call('TIME')[1])
+local replies = {}
+for i, base in ipairs(KEYS) do
+  local window_seconds = tonumber(ARGV[4 * i - 3])
+  local limit = tonumber(ARGV[4 * i - 2])
+  local hits = tonumber(ARGV[4 * i - 1])
+  local window_id = math.floor(now / window_seconds)
+  local key = base .. ':' .. window_id
+  local reset = (window_id + 1) * window_seconds
+  if hits > 1 then
+    local current = tonumber(redis.call('GET', key) or '0')
+    if current + hits > tonumber(ARGV[4 * i]) then
+      hits = 1
+    end
+  end
+  local count = redis.call('INCRBY', key, hits)
+  if count == hits then
+    redis.call('EXPIREAT', key, reset)
+  end
+  replies[i] = {count, reset, hits}
+  if count - hits >= limit then
+    break
+  end
+end
+return replies
+"""
+
+# Stripe-style concurrent request limiter: each in-flight request is a sorted
+# set member scored by its start time in milliseconds. Members older than the
+# TTL belong to workers that died without releasing and are dropped first.
+# ARGV: now_ms, ttl_ms, limit, member, ttl_seconds.
+_ACQUIRE_SLOT_SCRIPT = """
+redis.call('ZREMRANGEBYSCORE', KEYS[1], 0, tonumber(ARGV[1]) - tonumber(ARGV[2]))
+if redis.call('ZCARD', KEYS[1]) >= tonumber(ARGV[3]) then
+  return 0
+end
+redis.call('ZADD', KEYS[1], ARGV[1], ARGV[4])
+redis.call('EXPIRE', KEYS[1], ARGV[5])
+return 1
+"""
 
 
 class RedisRateLimiter(RateLimiter):
-    def __init__(self, redis_client, key_prefix: str = "rl", fallback: RateLimiter | None = None):
+    """
+    Window counters and concurrency slots shared through Redis.
+
+    A circuit breaker opens after ``failure_threshold`` consecutive Redis
+    errors. For ``cooldown_seconds`` afterwards calls go straight to the
+    fallback (or fail closed) instead of each waiting out a connect timeout;
+    the first call after the cooldown probes Redis again.
+
+    With ``lease_percent`` set, a window check reserves that share of the
+    rule's limit in one INCRBY and answers the following hits for the key
+    from the local reservation without a round trip. Reserved hits are
+    already counted in Redis, so instances never admit more than the limit
+    between them. Reservations are only made while they keep the count
+    within ``_LEASE_CEILING_PERCENT`` of the limit, so unused ones can make
+    other instances deny early, but never before the last 20% of the limit
+    has been counted one real request at a time.
+    """
+
+    _LEASE_CEILING_PERCENT = 80
+
+    def __init__(
+        self,
+        redis_client,
+        key_prefix: str = "rl",
+        fallback: RateLimiter | None = None,
+        failure_threshold: int = 5,
+        cooldown_seconds: float = 30,
+        lease_percent: int = 0,
+        max_leases: int = 10000,
+    ):
         self._redis = redis_client
         self._key_prefix = key_prefix
         self._fallback = fallback
+        self._failure_threshold = max(1, failure_threshold)
+        self._cooldown_seconds = cooldown_seconds
+        self._failures = 0
+        self._open_until = 0.0
+        self._lease_percent = max(0, min(100, lease_percent))
+        self._max_leases = max_leases
+        # key -> (reserved hits left, reset epoch, remaining beyond the reservation)
+        self._leases: dict[str, tuple[int, int, int]] = {}
+        # Called directly, never queued on a pipeline: a redis-py Script sends a
+        # single EVALSHA and reloads on NOSCRIPT, while a pipeline holding one
+        # sends SCRIPT EXISTS first on every execute().
+        self._check_windows = (
+            redis_client.register_script(_CHECK_WINDOWS_SCRIPT)
+            if redis_client is not None
+            else None
+        )
+        self._acquire_slot = (
+            redis_client.register_script(_ACQUIRE_SLOT_SCRIPT) if redis_client is not None else None
+        )
 
-    async def allow(self, key: str, rule: RateLimitRule) -> RateLimitResult:
-        now = time.time()
-        window_seconds = rule.window_seconds
-        window_id = int(now // window_seconds)
-        reset = int((window_id + 1) * window_seconds)
-        redis_key = f"{self._key_prefix}:{key}:{window_id}"
-        try:
-            pipeline = self._redis.pipeline()
-            pipeline.incr(redis_key, 1)
-            pipeline.expireat(redis_key, reset)
-            count, _ = await pipeline.execute()
-        except Exception:
-            if self._fallback:
-                logger.warning("Redis rate limiter unavailable; falling back to in-memory limiter")
-                return await self._fallback.allow(key, rule)
+    def _lease_size(self, rule: RateLimitRule) -> int:
+        return max(1, rule.limit * self._lease_percent // 100)
+
+    def _leased(self, key: str, rule: RateLimitRule) -> RateLimitResult | None:
+        lease = self._leases.get(key)
+        if lease is None:
+            return None
+        tokens, reset, beyond = lease
+        if time.time_ns() // _NS_PER_SECOND >= reset:
+            del self._leases[key]
+            return None
+        tokens -= 1
+        if tokens:
+            self._leases[key] = (tokens, reset, beyond)
+        else:
+            del self._leases[key]
+        return RateLimitResult(
+            allowed=True, remaining=tokens + beyond, reset_epoch=reset, limit=rule.limit
+        )
+
+    def _result(self, key: str, rule: RateLimitRule, reply) -> RateLimitResult:
+        count, reset, hits = int(reply[0]), int(reply[1]), int(reply[2])
+        # Of the hits just counted, only those that fit under the limit are
+        # granted: one answers this request, the rest are leased locally.
+        granted = min(hits, max(0, rule.limit - (count - hits)))
+        beyond = max(0, rule.limit - count)
+        if granted > 1:
+            if len(self._leases) >= self._max_leases:
+                self._prune_leases()
+            self._leases[key] = (granted - 1, reset, beyond)
+        return RateLimitResult(
+            allowed=granted > 0,
+            remaining=max(0, granted - 1) + beyond,
+            reset_epoch=reset,
+            limit=rule.limit,
+        )
+
+    def _prune_leases(self) -> None:
+        now = time.time_ns() // _NS_PER_SECOND
+        self._leases = {key: lease for key, lease in self._leases.items() if lease[1] > now}
+        while len(self._leases) >= self._max_leases:
+            del self._leases[next(iter(self._leases))]
+
+    def _circuit_open(self) -> bool:
+        return self._open_until > 0 and time.monotonic() < self._open_until
+
+    def _record_failure(self) -> None:
+        if self._fallback:
+            logger.warning("Redis rate limiter unavailable; falling back to in-memory limiter")
+        else:
             logger.warning("Redis rate limiter unavailable; failing closed")
-            return RateLimitResult(
-                allowed=False,
-                remaining=0,
-                reset_epoch=int(now + window_seconds),
-                limit=rule.limit,
+        self._failures += 1
+        if self._failures >= self._failure_threshold:
+            self._open_until = time.monotonic() + self._cooldown_seconds
+            logger.warning(
+                "Redis rate limiter failed %d times in a row; bypassing Redis for %ss",
+                self._failures,
+                self._cooldown_seconds,
             )
 
-        count = int(count)
-        remaining = max(0, rule.limit - count)
+    def _record_success(self) -> None:
+        self._failures = 0
+        self._open_until = 0.0
+
+    @staticmethod
+    def _fail_closed(rule: RateLimitRule, now_ns: int) -> RateLimitResult:
         return RateLimitResult(
-            allowed=count <= rule.limit,
-            remaining=remaining,
-            reset_epoch=reset,
+            allowed=False,
+            remaining=0,
+            reset_epoch=now_ns // _NS_PER_SECOND + rule.window_seconds,
             limit=rule.limit,
         )
 
+    async def allow(self, key: str, rule: RateLimitRule) -> RateLimitResult:
+        return (await self.allow_many([(key, rule)]))[0]
+
+    async def allow_many(
+        self, specs: Sequence[tuple[str, RateLimitRule]]
+    ) -> list[RateLimitResult]:
+        """
+        Check the rules in priority order with at most one Redis round trip.
+
+        Leading rules with a local lease are answered without Redis; the rest
+        go to one script call, which stops counting at the first denial.
+        """
+        results: list[RateLimitResult] = []
+        for index, (key, rule) in enumerate(specs):
+            leased = self._leased(key, rule)
+            if leased is None:
+                results.extend(await self._check_remote(specs[index:]))
+                break
+            results.append(leased)
+        return results
+
+    async def _check_remote(
+        self, specs: Sequence[tuple[str, RateLimitRule]]
+    ) -> list[RateLimitResult]:
+        if not self._circuit_open():
+            # A key that still holds a lease (a later rule, reached through
+            # Redis because an earlier one had none) is not leased again.
+            hits = [1 if key in self._leases else self._lease_size(rule) for key, rule in specs]
+            args: list[int] = []
+            for (_, rule), count in zip(specs, hits):
+                ceiling = rule.limit * self._LEASE_CEILING_PERCENT // 100
+                args.extend((rule.window_seconds, rule.limit, count, ceiling))
+            try:
+                replies = await self._check_windows(
+                    keys=[f"{self._key_prefix}:{key}" for key, _ in specs], args=args
+                )
+            except Exception:
+                self._record_failure()
+            else:
+                self._record_success()
+                return [
+                    self._result(key, rule, reply) for (key, rule), reply in zip(specs, replies)
+                ]
+
+        if self._fallback:
+            return await self._fallback.allow_many(specs)
+        return [self._fail_closed(specs[0][1], time.time_ns())]
+
+    @asynccontextmanager
+    async def concurrent_slot(
+        self, key: str, limit: int, ttl_seconds: int
+    ) -> AsyncIterator[bool]:
+        redis_key = f"{self._key_prefix}:{key}"
+        member = uuid4().hex
+        now_ms = time.time_ns() // 1_000_000
+        acquired = None
+        if not self._circuit_open():
+            try:
+                acquired = bool(
+                    await self._acquire_slot(
+                        keys=[redis_key],
+                        args=[now_ms, ttl_seconds * 1000, limit, member, ttl_seconds],
+                    )
+                )
+            except Exception:
+                self._record_failure()
+            else:
+                self._record_success()
+
+        if acquired is None:
+            if self._fallback:
+                async with self._fallback.concurrent_slot(key, limit, ttl_seconds) as local:
+                    yield local
+                return
+            yield False
+            return
+
+        if not acquired:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            try:
+                await self._redis.zrem(redis_key, member)
+            except Exception:
+                # The slot is dropped by the next acquire once its TTL passes.
+                logger.warning("Failed to release concurrent request slot for %s", key)
+
     async def close(self) -> None:
         if self._redis is None:
             return None
@@ -189,6 +640,11 @@ class RedisRateLimiter(RateLimiter):
             result = self._redis.close()
             if asyncio.iscoroutine(result):
                 await result
+            # A client built around an explicit pool does not own it, so the
+            # pooled sockets have to be released separately.
+            pool = getattr(self._redis, "connection_pool", None)
+            if pool is not None:
+                await pool.disconnect()
         except Exception:
             return None
         if self._fallback:
@@ -198,19 +654,62 @@ class RedisRateLimiter(RateLimiter):
 def build_rate_limiter_from_env(config: RateLimitConfig) -> RateLimiter:
     redis_url = os.environ.get("RATE_LIMIT_REDIS_URL") or os.environ.get("REDIS_URL")
     if redis_url and redis_async is not None:
-        client = redis_async.from_url(redis_url)
+        # Bounded pool: bursts wait briefly for a free connection instead of
+        # opening a new socket per concurrent request.
+        pool = redis_async.BlockingConnectionPool.from_url(
+            redis_url,
+            max_connections=_get_int("RATE_LIMIT_REDIS_POOL_SIZE", 32),
+            timeout=_get_int("RATE_LIMIT_REDIS_POOL_TIMEOUT", 2),
+        )
+        client = redis_async.Redis(connection_pool=pool)
         logger.info("Rate limiting using Redis backend")
         fallback = None
         if config.redis_fail_open:
             fallback = InMemoryRateLimiter(max_entries=config.max_cache_entries)
-        return RedisRateLimiter(client, fallback=fallback)
+        return RedisRateLimiter(
+            client,
+            fallback=fallback,
+            failure_threshold=_get_int("RATE_LIMIT_REDIS_BREAKER_FAILURES", 5),
+            cooldown_seconds=_get_int("RATE_LIMIT_REDIS_BREAKER_COOLDOWN_SECONDS", 30),
+            # Leases stop once a key's count reaches 80% of its limit, so in the
+            # worst case (every instance holding an unused lease) a key is denied
+            # after 20% of its limit in real requests. With N instances the
+            # unused share is at most min(80%, N * lease percent) of the limit.
+            lease_percent=_get_int("RATE_LIMIT_REDIS_LEASE_PERCENT", 0),
+            max_leases=config.max_cache_entries,
+        )
     if redis_url and redis_async is None:
         logger.warning("RATE_LIMIT_REDIS_URL set but redis package not installed; using in-memory limiter")
     return InMemoryRateLimiter(max_entries=config.max_cache_entries)
 
 
+# Header values for the small integers that limits and remaining counts almost
+# always are, so 429 responses do not format them on every rejection.
+_INT_BYTES = [str(value).encode("ascii") for value in range(1025)]
+
+
+def _int_to_bytes(value: int) -> bytes:
+    if 0 <= value <= 1024:
+        return _INT_BYTES[value]
+    return str(value).encode("ascii")
+
+
+_AUTH_PATH_PREFIXES = ("/auth", "/oauth", "/.well-known", "/mcp/.well-known")
+# One C-level match instead of a startswith() per prefix. Plain prefix match,
+# like startswith, so "/oauth2/token" still counts as an auth path.
+_AUTH_RE = re.compile("|".join(re.escape(prefix) for prefix in _AUTH_PATH_PREFIXES))
+
+
 class RateLimitMiddleware:
-    AUTH_PATH_PREFIXES = ("/auth", "/oauth", "/.well-known", "/mcp/.well-known")
+    # Kept for callers that read it; _AUTH_RE is what the middleware matches.
+    AUTH_PATH_PREFIXES = _AUTH_PATH_PREFIXES
+
+    _HEADER_CONTENT_TYPE = (b"content-type", b"application/json")
+    _HEADER_CONTENT_LENGTH = b"content-length"
+    _HEADER_RETRY_AFTER = b"retry-after"
+    _HEADER_LIMIT = b"x-ratelimit-limit"
+    _HEADER_REMAINING = b"x-ratelimit-remaining"
+    _HEADER_RESET = b"x-ratelimit-reset"
 
     def __init__(self, app, limiter: RateLimiter, config: RateLimitConfig):
         self.app = app
@@ -226,49 +725,74 @@ class RateLimitMiddleware:
             await self.app(scope, receive, send)
             return
 
-        headers = self._normalize_headers(scope.get("headers", []))
-        path = scope.get("path", "")
-        client_ip = self._get_client_ip(scope, headers)
-        api_key_prefix = self._extract_api_key_prefix(headers)
+        # One pass over the raw ASGI headers (names are lowercase bytes per
+        # spec) that keeps only the four the limiter reads.
+        forwarded_for = real_ip = authorization = x_api_key = None
+        for name, value in scope.get("headers", []):
+            if name == b"x-forwarded-for":
+                forwarded_for = value
+            elif name == b"x-real-ip":
+                real_ip = value
+            elif name == b"authorization":
+                authorization = value
+            elif name == b"x-api-key":
+                x_api_key = value
 
-        result = await self.limiter.allow(f"ip:{client_ip}", self.config.global_ip)
-        if not result.allowed:
-            await self._send_429(send, result, "global_ip")
-            return
+        path = scope.get("path", "")
+        client_ip = self._client_ip(
+            scope,
+            forwarded_for.decode("latin-1") if forwarded_for is not None else None,
+            real_ip.decode("latin-1") if real_ip is not None else None,
+        )
+        api_key_prefix = self._api_key_prefix_from_bytes(authorization, x_api_key)
 
+        # Collected in priority order and checked in one limiter call, so the
+        # Redis backend needs a single round trip however many rules apply.
+        specs = [(f"ip:{client_ip}", self.config.global_ip)]
+        limit_types = ["global_ip"]
         if self._is_auth_path(path):
-            result = await self.limiter.allow(f"auth-ip:{client_ip}", self.config.auth_ip)
-            if not result.allowed:
-                await self._send_429(send, result, "auth_ip")
-                return
-
+            specs.append((f"auth-ip:{client_ip}", self.config.auth_ip))
+            limit_types.append("auth_ip")
         if api_key_prefix:
-            result = await self.limiter.allow(f"key:{api_key_prefix}", self.config.api_key)
+            specs.append((f"key:{api_key_prefix}", self.config.api_key))
+            limit_types.append("api_key")
+
+        results = await self.limiter.allow_many(specs)
+        for result, limit_type in zip(results, limit_types):
             if not result.allowed:
-                await self._send_429(send, result, "api_key")
+                await self._send_429(send, result, limit_type)
                 return
 
-        await self.app(scope, receive, send)
+        concurrent_limit = self.config.concurrent_per_ip
+        if concurrent_limit <= 0:
+            await self.app(scope, receive, send)
+            return
 
-    @staticmethod
-    def _normalize_headers(headers) -> Dict[str, str]:
-        return {
-            (k.decode() if isinstance(k, bytes) else str(k)).lower():
-            (v.decode() if isinstance(v, bytes) else str(v))
-            for k, v in headers
-        }
+        # The window counters cap request rate, this caps requests held open
+        # at once, which a slow client can otherwise use to tie up workers.
+        async with self.limiter.concurrent_slot(
+            f"cc:{client_ip}", concurrent_limit, self.config.concurrent_ttl_seconds
+        ) as acquired:
+            if not acquired:
+                result = RateLimitResult(
+                    allowed=False,
+                    remaining=0,
+                    reset_epoch=int(time.time()) + 1,
+                    limit=concurrent_limit,
+                )
+                await self._send_429(send, result, "concurrent_ip")
+                return
+            await self.app(scope, receive, send)
 
-    def _get_client_ip(self, scope, headers: Dict[str, str]) -> str:
+    def _client_ip(self, scope, forwarded_for: str | None, real_ip: str | None) -> str:
         client = scope.get("client")
         client_ip = client[0] if client else ""
 
-        forwarded_for = headers.get("x-forwarded-for")
         if forwarded_for and self._is_trusted_proxy(client_ip):
             forwarded_ip = self._select_forwarded_ip(forwarded_for)
             if forwarded_ip:
                 return forwarded_ip
 
-        real_ip = headers.get("x-real-ip")
         if real_ip and self._is_trusted_proxy(client_ip):
             return real_ip.strip()
 
@@ -279,11 +803,11 @@ class RateLimitMiddleware:
     def _is_trusted_proxy(self, client_ip: str) -> bool:
         if self.config.trusted_proxy_count > 0:
             return True
-        if self.config.trusted_proxy_ips and client_ip:
-            return client_ip in self.config.trusted_proxy_ips
+        if self.config.trusted_proxy_ip_set and client_ip:
+            return client_ip in self.config.trusted_proxy_ip_set
         return False
 
-    def _select_forwarded_ip(self, forwarded_for: str) -> Optional[str]:
+    def _select_forwarded_ip(self, forwarded_for: str) -> str | None:
         ips = [ip.strip() for ip in forwarded_for.split(",") if ip.strip()]
         if not ips:
             return None
@@ -293,20 +817,27 @@ class RateLimitMiddleware:
         return ips[0]
 
     @staticmethod
-    def _extract_api_key_prefix(headers: Dict[str, str]) -> Optional[str]:
-        auth_header = headers.get("authorization", "")
-        api_key = ""
-        if auth_header.lower().startswith("bearer "):
-            api_key = auth_header.split(" ", 1)[1].strip()
-        elif "x-api-key" in headers:
-            api_key = headers.get("x-api-key", "").strip()
-
-        if api_key.startswith("rg_") and len(api_key) >= 11:
-            return api_key[:11]
+    def _api_key_prefix_from_bytes(
+        authorization: bytes | None, x_api_key: bytes | None
+    ) -> str | None:
+        if authorization is not None and authorization[:7].lower() == b"bearer ":
+            token, start = authorization, 7
+        elif x_api_key is not None:
+            token, start = x_api_key, 0
+        else:
+            return None
+
+        # Only the 11-byte key prefix is sliced and decoded, never the whole
+        # token, which can be a multi-kilobyte JWT.
+        while start < len(token) and token[start] in b" \t":
+            start += 1
+        prefix = token[start:start + 11]
+        if len(prefix) == 11 and prefix.startswith(b"rg_") and not prefix[-1:].isspace():
+            return prefix.decode("latin-1")
         return None
 
     def _is_auth_path(self, path: str) -> bool:
-        return any(path.startswith(prefix) for prefix in self.AUTH_PATH_PREFIXES)
+        return _AUTH_RE.match(path) is not None
 
     async def _send_429(self, send, result: RateLimitResult, limit_type: str) -> None:
         retry_after = max(0, result.reset_epoch - int(time.time()))
@@ -318,18 +849,18 @@ class RateLimitMiddleware:
             "reset_epoch": result.reset_epoch,
             "retry_after_seconds": retry_after,
         }
-        body = json.dumps(payload).encode("utf-8")
+        body = orjson.dumps(payload)
 
         await send({
             "type": "http.response.start",
             "status": 429,
             "headers": [
-                (b"content-type", b"application/json"),
-                (b"content-length", str(len(body)).encode()),
-                (b"retry-after", str(retry_after).encode()),
-                (b"x-ratelimit-limit", str(result.limit).encode()),
-                (b"x-ratelimit-remaining", str(result.remaining).encode()),
-                (b"x-ratelimit-reset", str(result.reset_epoch).encode()),
+                self._HEADER_CONTENT_TYPE,
+                (self._HEADER_CONTENT_LENGTH, _int_to_bytes(len(body))),
+                (self._HEADER_RETRY_AFTER, _int_to_bytes(retry_after)),
+                (self._HEADER_LIMIT, _int_to_bytes(result.limit)),
+                (self._HEADER_REMAINING, _int_to_bytes(result.remaining)),
+                (self._HEADER_RESET, _int_to_bytes(result.reset_epoch)),
             ],
         })
         await send({
@@ -7,10 +7,11 @@ Security middlewares for ReceiptGate.
 
 from __future__ import annotations
 
-import json
 import os
 from dataclasses import dataclass
-from typing import Dict, Optional
+from typing import Optional
+
+import orjson
 
 
 def _get_bool(env_name: str, default: bool) -> bool:
@@ -86,6 +87,28 @@ class SecurityHeadersMiddleware:
     def __init__(self, app, config: SecurityHeadersConfig):
         self.app = app
         self.config = config
+        self._headers = self._build_headers(config)
+
+    @staticmethod
+    def _build_headers(config: SecurityHeadersConfig) -> tuple[tuple[bytes, bytes], ...]:
+        """Encode the configured headers once; every response reuses the same bytes."""
+        headers = [
+            ("x-content-type-options", "nosniff"),
+            ("x-frame-options", config.frame_options),
+            ("referrer-policy", config.referrer_policy),
+            ("permissions-policy", config.permissions_policy),
+            ("content-security-policy", config.content_security_policy or ""),
+        ]
+        if config.enable_hsts:
+            hsts = f"max-age={config.hsts_max_age}"
+            if config.hsts_include_subdomains:
+                hsts += "; includeSubDomains"
+            if config.hsts_preload:
+                hsts += "; preload"
+            headers.append(("strict-transport-security", hsts))
+        return tuple(
+            (name.encode("latin1"), value.encode("latin1")) for name, value in headers if value
+        )
 
     async def __call__(self, scope, receive, send):
         if scope["type"] != "http" or not self.config.enabled:
@@ -95,31 +118,10 @@ class SecurityHeadersMiddleware:
         async def send_wrapper(message):
             if message["type"] == "http.response.start":
                 headers = list(message.get("headers", []))
-                existing = {
-                    (k.decode("latin1") if isinstance(k, bytes) else k).lower()
-                    for k, _ in headers
-                }
-
-                def _add(name: str, value: str) -> None:
-                    if name.lower() not in existing and value:
-                        headers.append((name.encode("latin1"), value.encode("latin1")))
-
-                _add("X-Content-Type-Options", "nosniff")
-                _add("X-Frame-Options", self.config.frame_options)
-                _add("Referrer-Policy", self.config.referrer_policy)
-                _add("Permissions-Policy", self.config.permissions_policy)
-
-                if self.config.content_security_policy:
-                    _add("Content-Security-Policy", self.config.content_security_policy)
-
-                if self.config.enable_hsts:
-                    hsts = f"max-age={self.config.hsts_max_age}"
-                    if self.config.hsts_include_subdomains:
-                        hsts += "; includeSubDomains"
-                    if self.config.hsts_preload:
-                        hsts += "; preload"
-                    _add("Strict-Transport-Security", hsts)
-
+                existing = {name.lower() for name, _ in headers}
+                headers.extend(
+                    header for header in self._headers if header[0] not in existing
+                )
                 message["headers"] = headers
 
             await send(message)
@@ -148,12 +150,20 @@ class RequestSizeLimitMiddleware:
             await self.app(scope, receive, send)
             return
 
-        headers = self._normalize_headers(scope.get("headers", []))
-        content_length = headers.get("content-length")
+        # Only Content-Length matters here: scan for it instead of decoding every header.
+        content_length = None
+        for name, value in scope.get("headers", ()):
+            if name.lower() == b"content-length":
+                content_length = value
+                break
         if content_length and content_length.isdigit():
             if int(content_length) > self.config.max_body_bytes:
                 await self._send_413(send, self.config.max_body_bytes)
                 return
+            # The server frames the body by Content-Length, so a declared size
+            # within the limit needs no per-chunk accounting.
+            await self.app(scope, receive, send)
+            return
 
         received = 0
 
@@ -172,21 +182,13 @@ class RequestSizeLimitMiddleware:
         except _RequestTooLarge:
             await self._send_413(send, self.config.max_body_bytes)
 
-    @staticmethod
-    def _normalize_headers(headers) -> Dict[str, str]:
-        return {
-            (k.decode() if isinstance(k, bytes) else str(k)).lower():
-            (v.decode() if isinstance(v, bytes) else str(v))
-            for k, v in headers
-        }
-
     @staticmethod
     async def _send_413(send, max_body_bytes: int) -> None:
         payload = {
             "error": "request_too_large",
             "max_body_bytes": max_body_bytes,
         }
-        body = json.dumps(payload).encode("utf-8")
+        body = orjson.dumps(payload)
         await send({
             "type": "http.response.start",
             "status": 413,
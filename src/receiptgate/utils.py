@@ -2,7 +2,6 @@
 
 from __future__ import annotations
 
-import copy
 import hashlib
 import json
 from datetime import datetime, timezone
@@ -14,6 +13,9 @@ def utc_now() -> datetime:
 
 
 def normalize_datetime(value: datetime) -> datetime:
+    if value.tzinfo is timezone.utc:
+        # Already normalized: datetimes are immutable, so no copy is needed.
+        return value
     if value.tzinfo is None:
         return value.replace(tzinfo=timezone.utc)
     return value.astimezone(timezone.utc)
@@ -26,9 +28,11 @@ def canonical_hash(payload: dict[str, Any], include_created_at: bool) -> tuple[s
     When created_at is server-generated, omit it from the canonical hash to keep
     idempotency stable across replays.
     """
-    canonical_payload = copy.deepcopy(payload)
-    if not include_created_at:
-        canonical_payload.pop("created_at", None)
+    # Serialization never mutates, so only the top level is copied, and only
+    # when created_at has to be dropped.
+    canonical_payload = payload
+    if not include_created_at and "created_at" in payload:
+        canonical_payload = {key: value for key, value in payload.items() if key != "created_at"}
 
     canonical_json = json.dumps(
         canonical_payload,
@@ -42,6 +46,6 @@ def canonical_hash(payload: dict[str, Any], include_created_at: bool) -> tuple[s
 
 def json_size_bytes(data: Any) -> int:
     """Return byte size of JSON-serialized data using canonical separators."""
-    payload = json.dumps(data, separators=(",", ":"), ensure_ascii=True)
-    return len(payload.encode("utf-8"))
+    # ensure_ascii output is pure ASCII: its length in characters is its length in bytes.
+    return len(json.dumps(data, separators=(",", ":"), ensure_ascii=True))
 
@@ -3,15 +3,24 @@
 from __future__ import annotations
 
 import json
+from functools import lru_cache
 from pathlib import Path
 from typing import Any
 
+import orjson
+
 try:
     import jsonschema
     JSONSCHEMA_AVAILABLE = True
 except ImportError:
     JSONSCHEMA_AVAILABLE = False
 
+try:
+    import jsonschema_rs
+    JSONSCHEMA_RS_AVAILABLE = True
+except ImportError:
+    JSONSCHEMA_RS_AVAILABLE = False
+
 
 FIELD_SIZE_LIMITS = {
     "inputs": 64 * 1024,
@@ -20,18 +29,20 @@ FIELD_SIZE_LIMITS = {
     "outcome_text": 100 * 1024,
 }
 
-TERMINAL_PHASES = {"complete", "escalate"}
+TERMINAL_PHASES: frozenset[str] = frozenset({"complete", "escalate"})
 
 
+@lru_cache(maxsize=1)
 def _schema_path() -> Path:
     root = Path(__file__).resolve().parents[2]
     return root / "schema" / "receipt.schema.v1.json"
 
 
 def _json_size_bytes(value: Any) -> int:
+    # Same encoding the ledger stores payloads with: compact UTF-8 from orjson.
     try:
-        return len(json.dumps(value, default=str).encode("utf-8"))
-    except Exception:
+        return len(orjson.dumps(value, default=str, option=orjson.OPT_NON_STR_KEYS))
+    except orjson.JSONEncodeError:
         return len(str(value).encode("utf-8"))
 
 
@@ -40,7 +51,12 @@ def validate_field_sizes(payload: dict[str, Any]) -> list[dict[str, Any]]:
     for field, limit in FIELD_SIZE_LIMITS.items():
         if field not in payload:
             continue
-        size = _json_size_bytes(payload[field])
+        value = payload[field]
+        # A JSON string costs at most 6 bytes per character (\uXXXX escapes)
+        # plus its quotes, so short strings are accepted without encoding them.
+        if isinstance(value, str) and 6 * len(value) + 2 <= limit:
+            continue
+        size = _json_size_bytes(value)
         if size > limit:
             errors.append({
                 "field": field,
@@ -62,24 +78,74 @@ def validate_routing_invariant(payload: dict[str, Any]) -> list[dict[str, Any]]:
     return errors
 
 
+@lru_cache(maxsize=1)
+def _schema_document() -> dict[str, Any] | None:
+    schema_path = _schema_path()
+    if not schema_path.exists():
+        return None
+    with schema_path.open("r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+@lru_cache(maxsize=1)
+def _schema_validator():
+    """Return the compiled receipt schema validator, built on first use."""
+    schema = _schema_document()
+    if schema is None:
+        return None
+    validator_cls = jsonschema.validators.validator_for(schema)
+    validator_cls.check_schema(schema)
+    return validator_cls(schema)
+
+
+@lru_cache(maxsize=1)
+def _fast_schema_validator():
+    """Rust-backed validator (jsonschema-rs) used only to accept valid payloads quickly."""
+    schema = _schema_document()
+    if schema is None or not JSONSCHEMA_RS_AVAILABLE:
+        return None
+    return jsonschema_rs.validator_for(schema)
+
+
+def preload_schema() -> None:
+    """
+    Compile the schema validators now instead of on the first receipt.
+
+    Called from create_app, so under a preloading server (gunicorn --preload)
+    the parsed schema is built once before workers fork and shared copy-on-write.
+    """
+    if JSONSCHEMA_AVAILABLE:
+        _schema_validator()
+        _fast_schema_validator()
+
+
+def reload_schema() -> None:
+    """Drop the compiled validators so the next validation re-reads the schema file."""
+    _schema_document.cache_clear()
+    _schema_validator.cache_clear()
+    _fast_schema_validator.cache_clear()
+
+
 def validate_json_schema(payload: dict[str, Any]) -> list[dict[str, Any]]:
     if not JSONSCHEMA_AVAILABLE:
         return []
 
-    schema_path = _schema_path()
-    if not schema_path.exists():
+    # Most receipts are valid: let jsonschema-rs accept them when installed, and
+    # keep the pure-Python validator for best_match error reporting.
+    fast_validator = _fast_schema_validator()
+    if fast_validator is not None and fast_validator.is_valid(payload):
         return []
 
-    with schema_path.open("r", encoding="utf-8") as f:
-        schema = json.load(f)
+    validator = _schema_validator()
+    if validator is None:
+        return []
 
-    try:
-        jsonschema.validate(payload, schema)
-    except jsonschema.ValidationError as exc:
+    error = jsonschema.exceptions.best_match(validator.iter_errors(payload))
+    if error is not None:
         return [{
-            "field": ".".join(str(p) for p in exc.path) if exc.path else "unknown",
+            "field": ".".join(str(p) for p in error.path) if error.path else "unknown",
             "constraint": "json_schema",
-            "message": f"JSON Schema validation failed: {exc.message}",
+            "message": f"JSON Schema validation failed: {error.message}",
         }]
     return []
 
@@ -100,7 +166,13 @@ def is_terminal_receipt(payload: dict[str, Any]) -> bool:
 
 def apply_server_fields(payload: dict[str, Any], *, tenant_id: str, stored_at: str) -> dict[str, Any]:
     """Apply server-assigned fields without mutating input."""
-    updated = dict(payload)
-    updated["tenant_id"] = tenant_id
-    updated["stored_at"] = stored_at
-    return updated
+    return {**payload, "tenant_id": tenant_id, "stored_at": stored_at}
+
+
+def apply_server_fields_inplace(
+    payload: dict[str, Any], *, tenant_id: str, stored_at: str
+) -> dict[str, Any]:
+    """Apply server-assigned fields to a payload the caller owns (e.g. freshly parsed JSON)."""
+    payload["tenant_id"] = tenant_id
+    payload["stored_at"] = stored_at
+    return payload
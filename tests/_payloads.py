@@ -0,0 +1,31 @@
+"""Receipt fields shared by every test payload helper."""
+
+from __future__ import annotations
+
+from collections.abc import Mapping
+from types import MappingProxyType
+from typing import Any
+
+# Read-only so a helper that forgets to copy cannot leak edits into other tests.
+BASE_PAYLOAD: Mapping[str, Any] = MappingProxyType({
+    "schema_version": "1.0",
+    "parent_task_id": "NA",
+    "dedupe_key": "NA",
+    "attempt": 0,
+    "from_principal": "principal:p",
+    "for_principal": "principal:p",
+    "source_system": "receiptgate-test",
+    "trust_domain": "test",
+    "realtime": False,
+    "task_type": "test.task",
+    "expected_outcome_kind": "response_text",
+    "expected_artifact_mime": "NA",
+    "artifact_location": "NA",
+    "artifact_pointer": "NA",
+    "artifact_checksum": "NA",
+    "artifact_size_bytes": 0,
+    "artifact_mime": "NA",
+    "retry_requested": False,
+    "read_at": None,
+    "archived_at": None,
+})
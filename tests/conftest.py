@@ -1,6 +1,8 @@
 from __future__ import annotations
 
+import asyncio
 import os
+import shutil
 import sys
 from pathlib import Path
 
@@ -19,17 +21,46 @@ os.environ.setdefault("RECEIPTGATE_API_KEY", "test-key")
 from receiptgate.config import settings
 from receiptgate.db import apply_schema, DB
 
+try:
+    import uvloop
+    UVLOOP_AVAILABLE = True
+except ImportError:
+    UVLOOP_AVAILABLE = False
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_asyncio_loop_factories(config, item):
+    """Run async tests on uvloop, which uvicorn[standard] installs off Windows."""
+    if UVLOOP_AVAILABLE:
+        return {"uvloop": uvloop.new_event_loop}
+    return {"asyncio": asyncio.new_event_loop}
+
+
+@pytest.fixture(scope="session")
+def schema_template(tmp_path_factory):
+    """A SQLite file with every schema layer applied, built once and copied per test."""
+    db_path = tmp_path_factory.mktemp("schema") / "template.db"
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr(settings, "enable_graph_layer", True)
+        patch.setattr(settings, "enable_semantic_layer", True)
+        engine = create_engine(f"sqlite:///{db_path}")
+        try:
+            apply_schema(engine)
+        finally:
+            engine.dispose()
+    return db_path
+
 
 @pytest.fixture()
-def db_session(tmp_path, monkeypatch):
+def db_session(tmp_path, monkeypatch, schema_template):
     db_path = tmp_path / "receiptgate.db"
+    shutil.copyfile(schema_template, db_path)
     monkeypatch.setattr(settings, "database_url", f"sqlite:///{db_path}")
     monkeypatch.setattr(settings, "allow_insecure_dev", True)
     monkeypatch.setattr(settings, "enable_graph_layer", True)
     monkeypatch.setattr(settings, "enable_semantic_layer", True)
 
     engine = create_engine(settings.database_url, connect_args={"check_same_thread": False})
-    apply_schema(engine)
     Session = sessionmaker(bind=engine)
     db = Session()
     try:
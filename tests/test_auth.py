@@ -40,6 +40,40 @@ def test_verify_api_key_invalid_header_raises(monkeypatch):
     assert exc.value.status_code == 401
 
 
+def test_verify_api_key_compares_candidate_in_constant_time(monkeypatch):
+    monkeypatch.setattr(settings, "allow_insecure_dev", False)
+    monkeypatch.setattr(settings, "api_key", SecretStr("rg_test"))
+
+    compared = []
+
+    def _compare_digest(a, b):
+        compared.append((a, b))
+        return a == b
+
+    monkeypatch.setattr("receiptgate.auth.secrets.compare_digest", _compare_digest)
+
+    with pytest.raises(HTTPException):
+        verify_api_key(authorization="Bearer rg_tesx")
+    assert compared == []
+
+    assert verify_api_key(authorization="Bearer rg_test") is True
+    assert compared == [(b"rg_test", b"rg_test")]
+
+
+def test_verify_api_key_accepts_additional_keys(monkeypatch):
+    monkeypatch.setattr(settings, "allow_insecure_dev", False)
+    monkeypatch.setattr(settings, "api_key", SecretStr("rg_primary"))
+    monkeypatch.setattr(settings, "api_keys", SecretStr("rg_next, rg_ci"))
+
+    assert verify_api_key(authorization="Bearer rg_primary") is True
+    assert verify_api_key(authorization=None, x_api_key="rg_next") is True
+    assert verify_api_key(authorization="Bearer rg_ci") is True
+
+    with pytest.raises(HTTPException) as exc:
+        verify_api_key(authorization="Bearer rg_other")
+    assert exc.value.status_code == 401
+
+
 def test_verify_api_key_valid_header(monkeypatch):
     monkeypatch.setattr(settings, "allow_insecure_dev", False)
     monkeypatch.setattr(settings, "api_key", SecretStr("rg_test"))
@@ -0,0 +1,17 @@
+from __future__ import annotations
+
+from pydantic import SecretStr
+
+from receiptgate.config import settings
+
+
+def test_derived_settings_follow_field_updates(monkeypatch):
+    monkeypatch.setattr(settings, "api_key", SecretStr("rg_first"))
+    monkeypatch.setattr(settings, "database_url", "sqlite:///./first.db")
+    assert settings.api_key_value == "rg_first"
+    assert settings.db_backend == "sqlite"
+
+    monkeypatch.setattr(settings, "api_key", SecretStr("rg_second"))
+    monkeypatch.setattr(settings, "database_url", "postgresql://localhost/receiptgate")
+    assert settings.api_key_value == "rg_second"
+    assert settings.db_backend == "postgres"
@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import pytest
+from sqlalchemy import create_engine, event
+
+from receiptgate.config import settings
+from receiptgate.db import (
+    DB,
+    DBSessionMiddleware,
+    _engine_kwargs,
+    _use_orjson_loads,
+    current_session,
+    get_db_session,
+    init_db,
+    require_json_support,
+)
+
+
+def test_engine_kwargs_size_pool_for_server_backends(monkeypatch):
+    monkeypatch.setattr(settings, "database_url", "postgresql+psycopg://rg@localhost/receiptgate")
+    monkeypatch.setattr(settings, "db_pool_size", 7)
+    monkeypatch.setattr(settings, "db_max_overflow", 3)
+
+    kwargs = _engine_kwargs()
+    assert kwargs["pool_use_lifo"] is True
+    assert kwargs["connect_args"] == {"prepare_threshold": 1}
+
+    engine = create_engine(settings.database_url, **kwargs)
+    try:
+        assert engine.pool.size() == 7
+        assert engine.pool._max_overflow == 3
+    finally:
+        engine.dispose()
+
+
+def test_engine_kwargs_prepare_threshold_is_psycopg_only(monkeypatch):
+    monkeypatch.setattr(settings, "database_url", "postgresql+psycopg2://rg@localhost/receiptgate")
+    assert "connect_args" not in _engine_kwargs()
+
+
+def test_engine_kwargs_sqlite_skips_pool_sizing(monkeypatch):
+    monkeypatch.setattr(settings, "database_url", "sqlite:///./receiptgate.db")
+
+    kwargs = _engine_kwargs()
+    assert kwargs["connect_args"] == {"check_same_thread": False}
+    assert "pool_size" not in kwargs
+
+
+def test_init_db_decodes_psycopg_json_with_orjson(monkeypatch):
+    monkeypatch.setattr(DB, "engine", None)
+    monkeypatch.setattr(DB, "SessionLocal", None)
+    monkeypatch.setattr(settings, "auto_migrate_on_startup", False)
+    monkeypatch.setattr(settings, "database_url", "postgresql+psycopg://rg@localhost/receiptgate")
+
+    init_db()
+    try:
+        assert event.contains(DB.engine, "connect", _use_orjson_loads)
+    finally:
+        DB.engine.dispose()
+
+
+def test_require_json_support_rejects_sqlite_without_json1(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'json.db'}")
+    try:
+        require_json_support(engine)
+
+        @event.listens_for(engine, "connect")
+        def drop_json(dbapi_connection, connection_record):
+            dbapi_connection.create_function("json_extract", 2, None)
+
+        engine.dispose()
+        with pytest.raises(RuntimeError, match="JSON1"):
+            require_json_support(engine)
+    finally:
+        engine.dispose()
+
+
+def test_require_json_support_rejects_sqlite_without_returning(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+
+    @event.listens_for(engine, "connect")
+    def pretend_old(dbapi_connection, connection_record):
+        dbapi_connection.create_function("sqlite_version", 0, lambda: "3.34.1")
+
+    try:
+        with pytest.raises(RuntimeError, match=r">= 3\.35\.0"):
+            require_json_support(engine)
+    finally:
+        engine.dispose()
+
+
+class _FakeSession:
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.mark.asyncio
+async def test_db_session_middleware_opens_lazily_and_closes(monkeypatch):
+    opened = []
+
+    def _session_factory():
+        session = _FakeSession()
+        opened.append(session)
+        return session
+
+    monkeypatch.setattr(DB, "SessionLocal", _session_factory)
+
+    async def no_db_app(scope, receive, send):
+        return None
+
+    async def db_app(scope, receive, send):
+        assert current_session() is current_session()
+
+    await DBSessionMiddleware(no_db_app)({"type": "http"}, None, None)
+    assert opened == []
+
+    await DBSessionMiddleware(db_app)({"type": "http"}, None, None)
+    assert len(opened) == 1
+    assert opened[0].closed is True
+
+    with pytest.raises(RuntimeError):
+        current_session()
+
+
+@pytest.mark.asyncio
+async def test_get_db_session_reuses_request_session(monkeypatch):
+    opened = []
+
+    def _session_factory():
+        session = _FakeSession()
+        opened.append(session)
+        return session
+
+    monkeypatch.setattr(DB, "SessionLocal", _session_factory)
+
+    async def db_app(scope, receive, send):
+        dependency = get_db_session()
+        assert next(dependency) is current_session()
+        dependency.close()
+        assert opened[0].closed is False
+
+    await DBSessionMiddleware(db_app)({"type": "http"}, None, None)
+    assert len(opened) == 1
+    assert opened[0].closed is True
+
+    dependency = get_db_session()
+    standalone = next(dependency)
+    dependency.close()
+    assert standalone is opened[1]
+    assert standalone.closed is True
@@ -1,6 +1,26 @@
 from __future__ import annotations
 
-from receiptgate.ledger_v1 import list_inbox, store_receipt
+from datetime import datetime, timezone
+from uuid import UUID
+
+import pytest
+from sqlalchemy import text
+
+from receiptgate.ledger_v1 import (
+    ReceiptConflictError,
+    _get_receipts_statement,
+    _list_inbox_statement,
+    _now_iso,
+    _receipt_chain_statement,
+    _uuid7,
+    get_receipt,
+    get_receipt_chain,
+    list_inbox,
+    list_task_receipts,
+    put_receipts,
+    search_receipts,
+    store_receipt,
+)
 
 
 def test_inbox_excludes_terminal_receipts(db_session):
@@ -16,6 +36,9 @@ def test_inbox_excludes_terminal_receipts(db_session):
 
     inbox = list_inbox(db_session, tenant_id, "agent:a", limit=10)
     assert inbox["count"] == 1
+    [entry] = inbox["receipts"]
+    assert type(entry) is dict
+    assert set(entry) == {"receipt_id", "task_id", "phase", "stored_at"}
 
     complete = {
         "receipt_id": "r-complete",
@@ -53,3 +76,239 @@ def test_inbox_is_tenant_scoped(db_session):
 
     assert {r["receipt_id"] for r in inbox_a["receipts"]} == {"r-a"}
     assert {r["receipt_id"] for r in inbox_b["receipts"]} == {"r-b"}
+
+
+def test_inbox_lists_each_open_receipt_once(db_session):
+    def receipt(receipt_id, task_id, phase):
+        return {
+            "receipt_id": receipt_id,
+            "recipient_ai": "agent:a",
+            "task_id": task_id,
+            "phase": phase,
+            "caused_by_receipt_id": "NA",
+        }
+
+    store_receipt(db_session, receipt("r-open-1", "task-open", "accepted"), "tenant-a")
+    store_receipt(db_session, receipt("r-open-2", "task-open", "accepted"), "tenant-a")
+    store_receipt(db_session, receipt("r-done", "task-done", "accepted"), "tenant-a")
+    store_receipt(db_session, receipt("r-done-c", "task-done", "complete"), "tenant-a")
+    store_receipt(db_session, receipt("r-done-e", "task-done", "escalate"), "tenant-a")
+
+    inbox = list_inbox(db_session, "tenant-a", "agent:a", limit=10)
+    assert sorted(r["receipt_id"] for r in inbox["receipts"]) == ["r-open-1", "r-open-2"]
+
+
+def test_get_receipt_round_trips_payload(db_session):
+    payload = {
+        "receipt_id": "r-json",
+        "recipient_ai": "agent:a",
+        "task_id": "task-json",
+        "phase": "accepted",
+        "caused_by_receipt_id": "NA",
+        "body": {"summary": "caf\u00e9", "items": [1, 2.5, None, True]},
+    }
+    stored = store_receipt(db_session, payload, "tenant-a")
+
+    fetched = get_receipt(db_session, "tenant-a", "r-json")
+    assert fetched["body"] == payload["body"]
+    assert fetched["stored_at"] == stored["stored_at"]
+
+    broken = store_receipt(db_session, dict(payload, receipt_id="r-broken"), "tenant-a")
+    db_session.execute(
+        text("UPDATE receipts_v1 SET payload = :payload WHERE receipt_id = :receipt_id"),
+        {"payload": "{not json", "receipt_id": "r-broken"},
+    )
+    assert get_receipt(db_session, "tenant-a", "r-broken") == {"stored_at": broken["stored_at"]}
+
+
+def test_get_receipt_is_served_from_cache(db_session):
+    store_receipt(
+        db_session,
+        {
+            "receipt_id": "r-cached",
+            "recipient_ai": "agent:a",
+            "task_id": "task-cached",
+            "phase": "accepted",
+            "caused_by_receipt_id": "NA",
+        },
+        "tenant-a",
+    )
+    first = get_receipt(db_session, "tenant-a", "r-cached")
+    first["phase"] = "mutated"
+
+    db_session.execute(text("DELETE FROM receipts_v1 WHERE receipt_id = 'r-cached'"))
+    cached = get_receipt(db_session, "tenant-a", "r-cached")
+    assert cached["phase"] == "accepted"
+    assert get_receipt(db_session, "tenant-b", "r-cached") is None
+
+
+def test_get_receipt_cache_hits_do_not_share_nested_values(db_session):
+    store_receipt(
+        db_session,
+        {
+            "receipt_id": "r-nested",
+            "recipient_ai": "agent:a",
+            "task_id": "task-nested",
+            "phase": "accepted",
+            "caused_by_receipt_id": "NA",
+            "inputs": {"k": 1},
+        },
+        "tenant-a",
+    )
+    get_receipt(db_session, "tenant-a", "r-nested")["inputs"]["k"] = 999
+    get_receipt(db_session, "tenant-a", "r-nested")["inputs"]["k"] = 999
+
+    assert get_receipt(db_session, "tenant-a", "r-nested")["inputs"] == {"k": 1}
+
+
+def test_task_listings_project_created_at(db_session):
+    store_receipt(
+        db_session,
+        {
+            "receipt_id": "r-created",
+            "recipient_ai": "agent:a",
+            "task_id": "task-created",
+            "phase": "accepted",
+            "caused_by_receipt_id": "NA",
+            "created_at": "2024-01-01T00:00:00+00:00",
+        },
+        "tenant-a",
+    )
+
+    headers = list_task_receipts(db_session, "tenant-a", "task-created")
+    assert headers["receipts"][0]["created_at"] == "2024-01-01T00:00:00+00:00"
+    assert "payload" not in headers["receipts"][0]
+
+    full = list_task_receipts(db_session, "tenant-a", "task-created", include_payload=True)
+    assert full["receipts"][0]["payload"]["receipt_id"] == "r-created"
+
+    found = search_receipts(db_session, "tenant-a", "task-created")
+    assert found["receipts"][0]["created_at"] == "2024-01-01T00:00:00+00:00"
+
+
+def test_receipt_chain_stops_at_max_depth(db_session):
+    caused_by = "NA"
+    for index in range(4):
+        store_receipt(
+            db_session,
+            {
+                "receipt_id": f"r-chain-{index}",
+                "recipient_ai": "agent:a",
+                "task_id": "task-chain",
+                "phase": "accepted",
+                "caused_by_receipt_id": caused_by,
+            },
+            "tenant-a",
+        )
+        caused_by = f"r-chain-{index}"
+
+    full = get_receipt_chain(db_session, "tenant-a", "r-chain-3")
+    assert [item["receipt_id"] for item in full["chain"]] == [
+        "r-chain-3",
+        "r-chain-2",
+        "r-chain-1",
+        "r-chain-0",
+    ]
+    assert full["chain"][-1]["caused_by_receipt_id"] == "NA"
+
+    capped = get_receipt_chain(db_session, "tenant-a", "r-chain-3", max_depth=2)
+    assert [item["receipt_id"] for item in capped["chain"]] == ["r-chain-3", "r-chain-2"]
+    assert get_receipt_chain(db_session, "tenant-b", "r-chain-3")["chain"] == []
+
+
+def test_search_receipts_pages_with_keyset_cursor(db_session):
+    for index in range(5):
+        store_receipt(
+            db_session,
+            {
+                "receipt_id": f"r-page-{index}",
+                "recipient_ai": "agent:a",
+                "task_id": "task-page",
+                "phase": "accepted",
+                "caused_by_receipt_id": "NA",
+            },
+            "tenant-a",
+        )
+
+    seen = []
+    cursor = None
+    while True:
+        page = search_receipts(db_session, "tenant-a", "task-page", limit=2, cursor=cursor)
+        seen.extend(item["receipt_id"] for item in page["receipts"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert sorted(seen) == [f"r-page-{index}" for index in range(5)]
+    assert len(seen) == 5
+
+
+def test_receipt_chain_stops_at_a_cycle(db_session):
+    for receipt_id, caused_by in (("r-loop-a", "r-loop-b"), ("r-loop-b", "r-loop-a")):
+        store_receipt(
+            db_session,
+            {
+                "receipt_id": receipt_id,
+                "recipient_ai": "agent:a",
+                "task_id": "task-loop",
+                "phase": "accepted",
+                "caused_by_receipt_id": caused_by,
+            },
+            "tenant-a",
+        )
+
+    chain = get_receipt_chain(db_session, "tenant-a", "r-loop-a")["chain"]
+    assert [item["receipt_id"] for item in chain] == ["r-loop-a", "r-loop-b"]
+
+
+def test_put_receipts_inserts_in_batches_and_reads_back_only_existing(db_session, monkeypatch):
+    monkeypatch.setattr("receiptgate.ledger_v1._INSERT_BATCH_ROWS", 2)
+
+    def receipt(index, **overrides):
+        return dict(
+            {
+                "receipt_id": f"r-bulk-{index}",
+                "recipient_ai": "agent:a",
+                "task_id": "task-bulk",
+                "phase": "accepted",
+                "caused_by_receipt_id": "NA",
+            },
+            **overrides,
+        )
+
+    store_receipt(db_session, receipt(1), "tenant-a")
+    results = put_receipts(db_session, [receipt(i) for i in range(5)] + [receipt(3)], "tenant-a")
+    assert [r["idempotent_replay"] for r in results] == [False, True, False, False, False, True]
+    assert len(list_task_receipts(db_session, "tenant-a", "task-bulk")["receipts"]) == 5
+
+    with pytest.raises(ReceiptConflictError):
+        put_receipts(db_session, [receipt(7), receipt(2, phase="complete")], "tenant-a")
+    assert get_receipt(db_session, "tenant-a", "r-bulk-7") is None
+
+
+def test_now_iso_is_fixed_width_utc(monkeypatch):
+    monkeypatch.setattr("receiptgate.ledger_v1.time.time_ns", lambda: 1_700_000_000_000_000_000)
+    assert _now_iso() == "2023-11-14T22:13:20.000000+00:00"
+
+    monkeypatch.undo()
+    stamp = _now_iso()
+    parsed = datetime.fromisoformat(stamp)
+    assert parsed.tzinfo == timezone.utc
+    assert abs((datetime.now(timezone.utc) - parsed).total_seconds()) < 5
+
+
+def test_uuid7_is_time_ordered(monkeypatch):
+    monkeypatch.setattr("receiptgate.ledger_v1.time.time_ns", lambda: 1_700_000_000_000_000_000)
+    first = UUID(_uuid7())
+    assert first.version == 7
+    assert first.variant == "specified in RFC 4122"
+    assert first.int >> 80 == 1_700_000_000_000
+
+    monkeypatch.setattr("receiptgate.ledger_v1.time.time_ns", lambda: 1_700_000_000_001_000_000)
+    assert str(first) < _uuid7()
+
+
+def test_postgres_statements_bind_arrays_instead_of_expanding():
+    assert "= ANY(:terminal_phases)" in str(_list_inbox_statement(True))
+    assert "= ANY(:receipt_ids)" in str(_get_receipts_statement(True))
+    assert "IN (__[POSTCOMPILE_terminal_phases])" in str(_list_inbox_statement(False))
+    assert "<> ALL(c.path)" in str(_receipt_chain_statement(True))
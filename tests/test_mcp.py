@@ -1,7 +1,14 @@
 from __future__ import annotations
 
+import asyncio
 from datetime import datetime, timezone
 
+from _payloads import BASE_PAYLOAD
+from pydantic import SecretStr
+
+from receiptgate.config import settings
+from receiptgate.mcp import routes
+
 
 def _receipt_payload(
     *,
@@ -15,51 +22,31 @@ def _receipt_payload(
     outcome_text: str = "NA",
 ):
     now = datetime.now(timezone.utc).isoformat()
-    completed_at = now if phase == "complete" else None
     return {
-        "schema_version": "1.0",
+        **BASE_PAYLOAD,
+        "task_body": "Testing receipt storage",
+        "escalation_class": "NA",
+        "escalation_reason": "NA",
+        "escalation_to": "NA",
+        "stored_at": None,
         "receipt_id": receipt_id,
         "task_id": task_id,
-        "parent_task_id": "NA",
         "caused_by_receipt_id": caused_by_receipt_id,
-        "dedupe_key": "NA",
-        "attempt": 0,
-        "from_principal": "principal:p",
-        "for_principal": "principal:p",
-        "source_system": "receiptgate-test",
         "recipient_ai": recipient_ai,
-        "trust_domain": "test",
         "phase": phase,
         "status": status,
-        "realtime": False,
-        "task_type": "test.task",
         "task_summary": f"Test task {phase}",
-        "task_body": "Testing receipt storage",
         "inputs": {"test": "data"},
-        "expected_outcome_kind": "response_text",
-        "expected_artifact_mime": "NA",
         "outcome_kind": outcome_kind,
         "outcome_text": outcome_text,
-        "artifact_location": "NA",
-        "artifact_pointer": "NA",
-        "artifact_checksum": "NA",
-        "artifact_size_bytes": 0,
-        "artifact_mime": "NA",
-        "escalation_class": "NA",
-        "escalation_reason": "NA",
-        "escalation_to": "NA",
-        "retry_requested": False,
         "body": {
             "summary": f"Test receipt {receipt_id}",
             "phase": phase,
         },
         "artifact_refs": [],
         "created_at": now,
-        "stored_at": None,
         "started_at": now if phase == "accepted" else None,
-        "completed_at": completed_at,
-        "read_at": None,
-        "archived_at": None,
+        "completed_at": now if phase == "complete" else None,
         "metadata": {},
     }
 
@@ -118,6 +105,123 @@ def test_submit_receipt_conflict_returns_error(mcp_client):
     assert response["error"]["code"] == "RECEIPT_ID_COLLISION"
 
 
+def test_streamed_task_listing_matches_buffered(mcp_client):
+    for index in range(3):
+        receipt = _receipt_payload(
+            receipt_id=f"r-s{index}",
+            task_id="task-s",
+            recipient_ai="agent:a",
+        )
+        _mcp_call(mcp_client, "receiptgate.submit_receipt", {"receipt": receipt})
+
+    arguments = {"task_id": "task-s", "include_payload": True}
+    buffered = _mcp_call(mcp_client, "receiptgate.list_task_receipts", arguments)
+    streamed = _mcp_call(mcp_client, "receiptgate.list_task_receipts", dict(arguments, stream=True))
+    assert streamed == buffered
+    assert len(streamed["receipts"]) == 3
+
+    search = {"root_task_id": "task-s", "limit": 2}
+    buffered = _mcp_call(mcp_client, "receiptgate.search_receipts", search)
+    streamed = _mcp_call(mcp_client, "receiptgate.search_receipts", dict(search, stream=True))
+    assert streamed == buffered
+
+    empty = _mcp_call(
+        mcp_client,
+        "receiptgate.list_task_receipts",
+        {"task_id": "none", "stream": True},
+    )
+    assert empty["receipts"] == []
+
+
+def test_search_receipts_rejects_malformed_cursor(mcp_client):
+    for index in range(2):
+        receipt = _receipt_payload(
+            receipt_id=f"r-c{index}",
+            task_id="task-c",
+            recipient_ai="agent:a",
+        )
+        _mcp_call(mcp_client, "receiptgate.submit_receipt", {"receipt": receipt})
+
+    search = {"root_task_id": "task-c", "limit": 1}
+    first = _mcp_call(mcp_client, "receiptgate.search_receipts", search)
+    second = _mcp_call(
+        mcp_client,
+        "receiptgate.search_receipts",
+        dict(search, cursor=first["next_cursor"]),
+    )
+    assert second["receipts"][0]["receipt_id"] != first["receipts"][0]["receipt_id"]
+
+    for cursor in (["garbage", "x"], [{"a": 1}, "x"], [first["next_cursor"][0], 1], "x"):
+        response = _mcp_raw(
+            mcp_client,
+            "receiptgate.search_receipts",
+            dict(search, cursor=cursor),
+        )
+        assert response["error"]["code"] == "validation_failed"
+
+
+def test_tool_handlers_run_off_the_event_loop(mcp_client, monkeypatch):
+    def probe(request_id, tenant_id, arguments):
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return routes._jsonrpc_result(request_id, {"on_loop": False})
+        return routes._jsonrpc_result(request_id, {"on_loop": True})
+
+    monkeypatch.setitem(routes.TOOL_DISPATCH, "receiptgate.health", probe)
+    assert _mcp_call(mcp_client, "receiptgate.health", {}) == {"on_loop": False}
+
+
+def test_tools_list_echoes_request_id(mcp_client):
+    response = mcp_client.post("/mcp", json={"jsonrpc": "2.0", "id": "abc", "method": "tools/list"})
+    assert response.headers["content-type"] == "application/json"
+    body = response.json()
+    assert body["id"] == "abc"
+    assert "receiptgate.submit_receipt" in {tool["name"] for tool in body["result"]["tools"]}
+
+
+def test_submit_receipts_batch_is_idempotent(mcp_client):
+    first = _receipt_payload(receipt_id="r-b1", task_id="task-b", recipient_ai="agent:a")
+    second = _receipt_payload(receipt_id="r-b2", task_id="task-b", recipient_ai="agent:a")
+    _mcp_call(mcp_client, "receiptgate.submit_receipt", {"receipt": first})
+
+    result = _mcp_call(
+        mcp_client,
+        "receiptgate.submit_receipts_batch",
+        {"receipts": [first, second, second]},
+    )
+    assert result["count"] == 3
+    assert [r["idempotent_replay"] for r in result["receipts"]] == [True, False, True]
+
+    stored = _mcp_call(mcp_client, "receiptgate.list_task_receipts", {"task_id": "task-b"})
+    assert {r["receipt_id"] for r in stored["receipts"]} == {"r-b1", "r-b2"}
+
+
+def test_submit_receipts_batch_rejects_conflicts_atomically(mcp_client):
+    stored = _receipt_payload(receipt_id="r-b3", task_id="task-b3", recipient_ai="agent:a")
+    _mcp_call(mcp_client, "receiptgate.submit_receipt", {"receipt": stored})
+
+    conflict = dict(stored, task_summary="Different summary")
+    fresh = _receipt_payload(receipt_id="r-b4", task_id="task-b3", recipient_ai="agent:a")
+    response = _mcp_raw(
+        mcp_client,
+        "receiptgate.submit_receipts_batch",
+        {"receipts": [fresh, conflict]},
+    )
+    assert response["error"]["code"] == "RECEIPT_ID_COLLISION"
+
+    invalid = _mcp_raw(
+        mcp_client,
+        "receiptgate.submit_receipts_batch",
+        {"receipts": [fresh, "nope"]},
+    )
+    assert invalid["error"]["code"] == "validation_failed"
+    assert invalid["error"]["details"][0]["index"] == 1
+
+    listed = _mcp_call(mcp_client, "receiptgate.list_task_receipts", {"task_id": "task-b3"})
+    assert [r["receipt_id"] for r in listed["receipts"]] == ["r-b3"]
+
+
 def test_inbox_returns_open_obligations(mcp_client):
     accepted = _receipt_payload(
         receipt_id="r-4",
@@ -260,3 +364,31 @@ def test_get_receipt_returns_payload(mcp_client):
         {"receipt_id": "r-9"},
     )
     assert result["receipt_id"] == "r-9"
+
+
+def test_invalid_envelope_returns_validation_error(mcp_client):
+    response = mcp_client.post("/mcp", json={"jsonrpc": "2.0", "id": 1})
+    assert response.status_code == 422
+    body = response.json()
+    assert body["ok"] is False
+    assert body["error"]["code"] == "VALIDATION_ERROR"
+    assert body["error"]["details"]["errors"][0]["loc"] == ["body", "method"]
+
+    malformed = mcp_client.post(
+        "/mcp",
+        content=b"{not json",
+        headers={"Content-Type": "application/json"},
+    )
+    assert malformed.status_code == 422
+    assert malformed.json()["error"]["details"]["errors"][0]["type"] == "json_invalid"
+
+
+def test_health_probe_skips_auth(mcp_client, monkeypatch):
+    monkeypatch.setattr(settings, "allow_insecure_dev", False)
+    monkeypatch.setattr(settings, "api_key", SecretStr("rg_test"))
+
+    response = mcp_client.get("/health")
+    assert response.status_code == 200
+    assert response.json() == {"ok": True, "service": settings.service_name}
+
+    assert mcp_client.post("/mcp", json={"method": "tools/list"}).status_code == 401
@@ -1,9 +1,11 @@
 from __future__ import annotations
 
+import os
+
 from sqlalchemy import create_engine, text
 
 from receiptgate.config import settings
-from receiptgate.db import apply_schema
+from receiptgate.db import _read_sql_file, apply_schema
 
 
 def _index_names(conn, table: str) -> set[str]:
@@ -40,10 +42,29 @@ def test_apply_schema_creates_tables_and_indexes(tmp_path, monkeypatch):
         edge_indexes = _index_names(conn, "receipt_edges")
         assert "idx_receipt_edges_to" in edge_indexes
 
+        embedding_indexes = _index_names(conn, "receipt_embeddings")
+        assert "idx_receipt_embeddings_content_hash" in embedding_indexes
+
         v1_indexes = _index_names(conn, "receipts_v1")
         assert "idx_receipts_v1_tenant_receipt" in v1_indexes
         assert "idx_receipts_v1_inbox" in v1_indexes
-        assert "idx_receipts_v1_task" in v1_indexes
+        assert "idx_receipts_v1_task" not in v1_indexes
+        assert "idx_receipts_v1_task_keyset" in v1_indexes
         assert "idx_receipts_v1_caused_by" in v1_indexes
+        assert "idx_receipts_v1_inbox_open" in v1_indexes
+        assert "idx_receipts_v1_task_phase" in v1_indexes
 
     engine.dispose()
+
+
+def test_read_sql_file_reparses_only_on_change(tmp_path):
+    path = tmp_path / "001_test.sql"
+    path.write_text("BEGIN;\nCREATE TABLE a (id INT);\nCOMMIT;\n", encoding="utf-8")
+
+    first = _read_sql_file(path)
+    assert first == ("CREATE TABLE a (id INT)",)
+    assert _read_sql_file(path) is first
+
+    path.write_text("CREATE TABLE b (id INT);\n", encoding="utf-8")
+    os.utime(path, ns=(path.stat().st_atime_ns, path.stat().st_mtime_ns + 1_000_000))
+    assert _read_sql_file(path) == ("CREATE TABLE b (id INT)",)
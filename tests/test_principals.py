@@ -16,6 +16,9 @@ def test_internal_principals_detected():
 def test_external_principals_rejected():
     assert is_internal_principal("agent:alpha") is False
     assert is_internal_principal("user:beta") is False
+    assert is_internal_principal("sys") is False
+    assert is_internal_principal("") is False
+    assert is_internal_principal("agent:sys:alpha") is False
 
 
 def test_internal_prefixes():
@@ -1,7 +1,9 @@
 from __future__ import annotations
 
 import asyncio
+import json
 import os
+import time
 
 import pytest
 
@@ -11,11 +13,96 @@ from receiptgate.rate_limiter import (
     RateLimitResult,
     RateLimitRule,
     RateLimitMiddleware,
+    RedisRateLimiter,
+    _ShardedCache,
+    _int_to_bytes,
     build_rate_limiter_from_env,
     load_rate_limit_config_from_env,
 )
 
 
+class _FakePipeline:
+    """Like redis-py's, a pipeline holding scripts sends SCRIPT EXISTS before executing."""
+
+    def __init__(self, redis):
+        self._redis = redis
+        self._queued = []
+        self.scripts = set()
+
+    async def execute(self):
+        if self.scripts:
+            self._redis.round_trips += 1
+        self._redis.round_trips += 1
+        if self._redis.fail:
+            raise ConnectionError("redis down")
+        queued, self._queued = self._queued, []
+        return [handler(keys, args) for handler, keys, args in queued]
+
+
+class _FakeRedis:
+    """Just enough of redis.asyncio to run the limiter's registered scripts."""
+
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+        self.counts: dict[str, int] = {}
+        self.expiries: dict[str, int] = {}
+        self.slots: dict[str, dict[str, int]] = {}
+        self.round_trips = 0
+
+    def check_windows(self, keys, args):
+        replies = []
+        for index, base in enumerate(keys):
+            window_seconds, limit, hits, ceiling = (
+                int(arg) for arg in args[4 * index:4 * index + 4]
+            )
+            window_id = time.time_ns() // 1_000_000_000 // window_seconds
+            key = f"{base}:{window_id}"
+            reset = (window_id + 1) * window_seconds
+            if hits > 1 and self.counts.get(key, 0) + hits > ceiling:
+                hits = 1
+            self.counts[key] = self.counts.get(key, 0) + hits
+            if self.counts[key] == hits:
+                self.expiries[key] = reset
+            replies.append([self.counts[key], reset, hits])
+            if self.counts[key] - hits >= limit:
+                break
+        return replies
+
+    def acquire_slot(self, keys, args):
+        now_ms, ttl_ms, limit, member, _ = args
+        slots = self.slots.setdefault(keys[0], {})
+        for stale in [m for m, started in slots.items() if started <= now_ms - ttl_ms]:
+            del slots[stale]
+        if len(slots) >= limit:
+            return 0
+        slots[member] = now_ms
+        return 1
+
+    async def zrem(self, key, member):
+        self.round_trips += 1
+        if self.fail:
+            raise ConnectionError("redis down")
+        self.slots.get(key, {}).pop(member, None)
+
+    def pipeline(self, transaction=True):
+        return _FakePipeline(self)
+
+    def register_script(self, script):
+        handler = self.acquire_slot if "ZADD" in script else self.check_windows
+
+        async def run(keys, args, client=None):
+            if client is not None:
+                client.scripts.add(handler)
+                client._queued.append((handler, keys, args))
+                return client
+            self.round_trips += 1
+            if self.fail:
+                raise ConnectionError("redis down")
+            return handler(keys, args)
+
+        return run
+
+
 @pytest.mark.asyncio
 async def test_in_memory_rate_limiter_allows_until_limit():
     limiter = InMemoryRateLimiter(max_entries=10)
@@ -44,6 +131,7 @@ def test_load_rate_limit_config_from_env(monkeypatch):
     assert config.global_ip.window_seconds == 10
     assert config.trusted_proxy_count == 1
     assert "1.1.1.1" in config.trusted_proxy_ips
+    assert config.trusted_proxy_ip_set == frozenset({"1.1.1.1", "2.2.2.2"})
 
 
 def test_build_rate_limiter_from_env_with_missing_redis(monkeypatch):
@@ -56,7 +144,7 @@ def test_build_rate_limiter_from_env_with_missing_redis(monkeypatch):
     assert isinstance(limiter, InMemoryRateLimiter)
 
 
-def test_rate_limit_middleware_helpers():
+def test_rate_limit_middleware_matches_auth_paths():
     config = RateLimitConfig(
         enabled=True,
         global_ip=RateLimitRule(limit=1, window_seconds=60),
@@ -70,25 +158,11 @@ def test_rate_limit_middleware_helpers():
     limiter = InMemoryRateLimiter()
     middleware = RateLimitMiddleware(app=lambda *_: None, limiter=limiter, config=config)
 
-    headers = [
-        (b"authorization", b"Bearer rg_12345678901"),
-        (b"x-forwarded-for", b"2.2.2.2, 3.3.3.3"),
-    ]
-    normalized = middleware._normalize_headers(headers)
-    assert normalized["authorization"].startswith("Bearer")
-    assert middleware._extract_api_key_prefix(normalized) == "rg_12345678"
-
-    forwarded_ip = middleware._select_forwarded_ip("2.2.2.2, 3.3.3.3")
-    assert forwarded_ip == "2.2.2.2"
-
-    client_ip = middleware._get_client_ip(
-        {"client": ("1.1.1.1", 1234)},
-        normalized,
-    )
-    assert client_ip == "2.2.2.2"
-
     assert middleware._is_auth_path("/auth/login") is True
     assert middleware._is_auth_path("/mcp") is False
+    assert middleware._is_auth_path("/oauth2/token") is True
+    assert middleware._is_auth_path("/mcp/.well-known/oauth-protected-resource") is True
+    assert middleware._is_auth_path("/receipts/auth") is False
 
 
 @pytest.mark.asyncio
@@ -117,3 +191,442 @@ async def test_rate_limit_middleware_send_429():
     assert messages[0]["status"] == 429
     header_names = {name for name, _ in messages[0]["headers"]}
     assert b"x-ratelimit-limit" in header_names
+    headers = dict(messages[0]["headers"])
+    body = json.loads(messages[1]["body"])
+    assert body["error"] == "rate_limit_exceeded"
+    assert body["limit_type"] == "global_ip"
+    assert headers[b"content-length"] == str(len(messages[1]["body"])).encode()
+    assert headers[b"x-ratelimit-reset"] == str(body["reset_epoch"]).encode()
+
+
+@pytest.mark.asyncio
+async def test_redis_rate_limiter_counts_with_one_script_call():
+    redis = _FakeRedis()
+    limiter = RedisRateLimiter(redis)
+    rule = RateLimitRule(limit=2, window_seconds=60)
+
+    results = [await limiter.allow("key", rule) for _ in range(3)]
+
+    assert [r.allowed for r in results] == [True, True, False]
+    assert redis.round_trips == 3
+    [(redis_key, expiry)] = redis.expiries.items()
+    assert redis_key.startswith("rl:key:")
+    assert expiry == results[0].reset_epoch
+
+
+@pytest.mark.asyncio
+async def test_redis_rate_limiter_falls_back_when_redis_fails():
+    rule = RateLimitRule(limit=1, window_seconds=60)
+
+    fail_open = RedisRateLimiter(_FakeRedis(fail=True), fallback=InMemoryRateLimiter())
+    assert (await fail_open.allow("key", rule)).allowed is True
+
+    fail_closed = RedisRateLimiter(_FakeRedis(fail=True))
+    assert (await fail_closed.allow("key", rule)).allowed is False
+
+
+@pytest.mark.asyncio
+async def test_redis_rate_limiter_allow_many_uses_one_round_trip():
+    redis = _FakeRedis()
+    limiter = RedisRateLimiter(redis)
+    specs = [
+        ("ip:1.2.3.4", RateLimitRule(limit=5, window_seconds=60)),
+        ("key:rg_12345678", RateLimitRule(limit=0, window_seconds=60)),
+    ]
+
+    results = await limiter.allow_many(specs)
+
+    assert redis.round_trips == 1
+    assert [r.allowed for r in results] == [True, False]
+    assert [r.remaining for r in results] == [4, 0]
+
+    redis.fail = True
+    closed = await limiter.allow_many(specs)
+    assert [r.allowed for r in closed] == [False]
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_middleware_checks_all_rules_in_one_call():
+    class RecordingLimiter(InMemoryRateLimiter):
+        def __init__(self):
+            super().__init__()
+            self.batches = []
+
+        async def allow_many(self, specs):
+            self.batches.append([key for key, _ in specs])
+            return await super().allow_many(specs)
+
+    config = RateLimitConfig(
+        enabled=True,
+        global_ip=RateLimitRule(limit=10, window_seconds=60),
+        api_key=RateLimitRule(limit=10, window_seconds=60),
+        auth_ip=RateLimitRule(limit=0, window_seconds=60),
+        max_cache_entries=100,
+        trusted_proxy_count=0,
+        trusted_proxy_ips=(),
+        redis_fail_open=True,
+    )
+    limiter = RecordingLimiter()
+    messages = []
+
+    async def app(scope, receive, send):
+        raise AssertionError("request should have been rate limited")
+
+    async def send(message):
+        messages.append(message)
+
+    middleware = RateLimitMiddleware(app, limiter, config)
+    scope = {
+        "type": "http",
+        "method": "POST",
+        "path": "/auth/token",
+        "client": ("1.2.3.4", 1234),
+        "headers": [(b"x-api-key", b"rg_1234567890")],
+    }
+    await middleware(scope, None, send)
+
+    assert limiter.batches == [["ip:1.2.3.4", "auth-ip:1.2.3.4", "key:rg_12345678"]]
+    assert messages[0]["status"] == 429
+    assert json.loads(messages[1]["body"])["limit_type"] == "auth_ip"
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_middleware_does_not_charge_keys_after_a_denial():
+    config = RateLimitConfig(
+        enabled=True,
+        global_ip=RateLimitRule(limit=1, window_seconds=60),
+        api_key=RateLimitRule(limit=10, window_seconds=60),
+        auth_ip=RateLimitRule(limit=10, window_seconds=60),
+        max_cache_entries=100,
+        trusted_proxy_count=0,
+        trusted_proxy_ips=(),
+        redis_fail_open=True,
+    )
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": "/mcp",
+        "client": ("1.2.3.4", 1234),
+        "headers": [(b"x-api-key", b"rg_1234567890")],
+    }
+    redis = _FakeRedis()
+    memory = InMemoryRateLimiter()
+
+    for limiter in (memory, RedisRateLimiter(redis)):
+        messages = []
+
+        async def app(scope, receive, send):
+            await send({"type": "http.response.start", "status": 200, "headers": []})
+
+        async def send(message):
+            messages.append(message)
+
+        middleware = RateLimitMiddleware(app, limiter, config)
+        await middleware(scope, None, send)
+        await middleware(scope, None, send)
+
+        assert [m["status"] for m in messages if "status" in m] == [200, 429]
+        assert json.loads(messages[2]["body"])["limit_type"] == "global_ip"
+
+    assert memory._counters.get("key:rg_12345678", (0, 0))[0] == 1
+    assert [count for key, count in redis.counts.items() if key.startswith("rl:key:")] == [1]
+    assert redis.round_trips == 2
+
+
+@pytest.mark.asyncio
+async def test_redis_rate_limiter_close_disconnects_pool():
+    class Pool:
+        disconnected = False
+
+        async def disconnect(self):
+            self.disconnected = True
+
+    class Client(_FakeRedis):
+        def __init__(self):
+            super().__init__()
+            self.connection_pool = Pool()
+            self.closed = False
+
+        async def close(self):
+            self.closed = True
+
+    client = Client()
+    await RedisRateLimiter(client).close()
+
+    assert client.closed
+    assert client.connection_pool.disconnected
+
+
+@pytest.mark.asyncio
+async def test_in_memory_rate_limiter_keeps_hot_keys_through_scans():
+    limiter = InMemoryRateLimiter(max_entries=10)
+    rule = RateLimitRule(limit=100, window_seconds=60)
+
+    for index in range(200):
+        if index % 10 == 0:
+            await limiter.allow("hot", rule)
+        await limiter.allow(f"scan-{index}", rule)
+
+    assert len(limiter._counters) <= 10
+    assert "hot" in limiter._counters
+    assert (await limiter.allow("hot", rule)).remaining == 79
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_middleware_decodes_raw_client_headers():
+    class RecordingLimiter(InMemoryRateLimiter):
+        def __init__(self):
+            super().__init__()
+            self.keys = []
+
+        async def allow_many(self, specs):
+            self.keys.extend(key for key, _ in specs)
+            return await super().allow_many(specs)
+
+    config = RateLimitConfig(
+        enabled=True,
+        global_ip=RateLimitRule(limit=10, window_seconds=60),
+        api_key=RateLimitRule(limit=10, window_seconds=60),
+        auth_ip=RateLimitRule(limit=10, window_seconds=60),
+        max_cache_entries=100,
+        trusted_proxy_count=1,
+        trusted_proxy_ips=(),
+        redis_fail_open=True,
+    )
+    limiter = RecordingLimiter()
+
+    async def app(scope, receive, send):
+        return None
+
+    middleware = RateLimitMiddleware(app, limiter, config)
+    scope = {"type": "http", "method": "GET", "path": "/mcp", "client": ("1.1.1.1", 1234)}
+    forwarded = [
+        (b"authorization", b"Bearer rg_12345678901"),
+        (b"x-forwarded-for", b"2.2.2.2, 3.3.3.3"),
+    ]
+    await middleware(dict(scope, headers=forwarded), None, None)
+    await middleware(dict(scope, headers=[(b"x-real-ip", b"caf\xe9")]), None, None)
+
+    assert limiter.keys == ["ip:2.2.2.2", "key:rg_12345678", "ip:caf\u00e9"]
+
+
+def test_rate_limit_middleware_extracts_api_key_prefix_from_raw_headers():
+    extract = RateLimitMiddleware._api_key_prefix_from_bytes
+
+    assert extract(b"Bearer  rg_1234567890", None) == "rg_12345678"
+    assert extract(b"bearer rg_" + b"x" * 4096, None) == "rg_xxxxxxxx"
+    assert extract(None, b" rg_1234567890 ") == "rg_12345678"
+    assert extract(b"Basic abc", b"rg_abcdefgh") == "rg_abcdefgh"
+    assert extract(b"Bearer eyJhbGciOi", b"rg_abcdefgh") is None
+    assert extract(None, b"rg_short") is None
+    assert extract(None, None) is None
+
+
+@pytest.mark.asyncio
+async def test_rate_limiters_bucket_windows_on_integer_nanoseconds(monkeypatch):
+    rule = RateLimitRule(limit=1, window_seconds=60)
+    assert rule.window_ns == 60_000_000_000
+
+    monkeypatch.setattr("receiptgate.rate_limiter.time.time_ns", lambda: 1_799_999_999_999_999_999)
+    limiter = InMemoryRateLimiter()
+    assert (await limiter.allow("key", rule)).reset_epoch == 1_800_000_000
+    assert (await limiter.allow("key", rule)).allowed is False
+
+    monkeypatch.setattr("receiptgate.rate_limiter.time.time_ns", lambda: 1_800_000_000_000_000_000)
+    fresh = await limiter.allow("key", rule)
+    assert fresh.allowed is True
+    assert fresh.reset_epoch == 1_800_000_060
+
+    redis = _FakeRedis()
+    assert (await RedisRateLimiter(redis).allow("key", rule)).reset_epoch == 1_800_000_060
+    assert list(redis.counts) == ["rl:key:30000000"]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_slots_are_bounded_and_released():
+    redis = _FakeRedis()
+    for limiter in (InMemoryRateLimiter(), RedisRateLimiter(redis)):
+        async with limiter.concurrent_slot("cc:1.2.3.4", 1, 60) as first:
+            async with limiter.concurrent_slot("cc:1.2.3.4", 1, 60) as second:
+                assert (first, second) == (True, False)
+            async with limiter.concurrent_slot("cc:5.6.7.8", 1, 60) as other:
+                assert other is True
+        async with limiter.concurrent_slot("cc:1.2.3.4", 1, 60) as again:
+            assert again is True
+    assert redis.slots == {"rl:cc:1.2.3.4": {}, "rl:cc:5.6.7.8": {}}
+
+    redis.fail = True
+    async with RedisRateLimiter(redis).concurrent_slot("cc:1.2.3.4", 1, 60) as closed:
+        assert closed is False
+    fail_open = RedisRateLimiter(redis, fallback=InMemoryRateLimiter())
+    async with fail_open.concurrent_slot("cc:1.2.3.4", 1, 60) as local:
+        assert local is True
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_middleware_rejects_excess_concurrent_requests():
+    config = RateLimitConfig(
+        enabled=True,
+        global_ip=RateLimitRule(limit=10, window_seconds=60),
+        api_key=RateLimitRule(limit=10, window_seconds=60),
+        auth_ip=RateLimitRule(limit=10, window_seconds=60),
+        max_cache_entries=100,
+        trusted_proxy_count=0,
+        trusted_proxy_ips=(),
+        redis_fail_open=True,
+        concurrent_per_ip=1,
+    )
+    release = asyncio.Event()
+    started = asyncio.Event()
+    messages = []
+
+    async def app(scope, receive, send):
+        started.set()
+        await release.wait()
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+
+    async def send(message):
+        messages.append(message)
+
+    middleware = RateLimitMiddleware(app, InMemoryRateLimiter(), config)
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": "/mcp",
+        "client": ("1.2.3.4", 1234),
+        "headers": [],
+    }
+
+    slow = asyncio.create_task(middleware(scope, None, send))
+    await started.wait()
+    await middleware(scope, None, send)
+    assert messages[0]["status"] == 429
+    assert json.loads(messages[1]["body"])["limit_type"] == "concurrent_ip"
+
+    release.set()
+    await slow
+    assert messages[2]["status"] == 200
+    await middleware(scope, None, send)
+    assert messages[3]["status"] == 200
+
+
+@pytest.mark.asyncio
+async def test_redis_rate_limiter_circuit_breaker_skips_redis_while_open(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr("receiptgate.rate_limiter.time.monotonic", lambda: clock[0])
+    redis = _FakeRedis(fail=True)
+    limiter = RedisRateLimiter(
+        redis, fallback=InMemoryRateLimiter(), failure_threshold=2, cooldown_seconds=30
+    )
+    rule = RateLimitRule(limit=10, window_seconds=60)
+
+    for _ in range(5):
+        assert (await limiter.allow("key", rule)).allowed is True
+    assert redis.round_trips == 2
+
+    redis.fail = False
+    clock[0] += 31
+    assert (await limiter.allow("key", rule)).allowed is True
+    assert redis.round_trips == 3
+    assert redis.counts
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_middleware_keys_on_forwarded_ip_and_api_key():
+    class RecordingLimiter(InMemoryRateLimiter):
+        def __init__(self):
+            super().__init__()
+            self.keys = []
+
+        async def allow_many(self, specs):
+            self.keys.extend(key for key, _ in specs)
+            return await super().allow_many(specs)
+
+    config = RateLimitConfig(
+        enabled=True,
+        global_ip=RateLimitRule(limit=10, window_seconds=60),
+        api_key=RateLimitRule(limit=10, window_seconds=60),
+        auth_ip=RateLimitRule(limit=10, window_seconds=60),
+        max_cache_entries=100,
+        trusted_proxy_count=0,
+        trusted_proxy_ips=("10.0.0.1",),
+        redis_fail_open=True,
+    )
+    limiter = RecordingLimiter()
+    calls = []
+
+    async def app(scope, receive, send):
+        calls.append(scope["path"])
+
+    middleware = RateLimitMiddleware(app, limiter, config)
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": "/mcp",
+        "client": ("10.0.0.1", 1234),
+        "headers": [
+            (b"host", b"example"),
+            (b"x-forwarded-for", b"203.0.113.7, 10.0.0.1"),
+            (b"authorization", b"Bearer rg_abcdefghijkl"),
+        ],
+    }
+    await middleware(scope, None, None)
+
+    assert calls == ["/mcp"]
+    assert limiter.keys == ["ip:203.0.113.7", "key:rg_abcdefgh"]
+
+
+def test_rate_limit_dataclasses_use_slots():
+    rule = RateLimitRule(limit=1, window_seconds=60)
+    result = RateLimitResult(allowed=True, remaining=0, reset_epoch=60, limit=1)
+    config = load_rate_limit_config_from_env()
+
+    for instance in (rule, result, config):
+        assert not hasattr(instance, "__dict__")
+    assert rule.window_ns == 60_000_000_000
+
+
+def test_int_to_bytes_matches_str_encoding():
+    for value in (0, 7, 1024, 1025, 1_800_000_060, -1):
+        assert _int_to_bytes(value) == str(value).encode()
+
+
+@pytest.mark.asyncio
+async def test_redis_rate_limiter_serves_hits_from_local_lease():
+    redis = _FakeRedis()
+    limiter = RedisRateLimiter(redis, lease_percent=40)
+    rule = RateLimitRule(limit=10, window_seconds=60)
+
+    results = [await limiter.allow("key", rule) for _ in range(12)]
+
+    assert [r.allowed for r in results] == [True] * 10 + [False] * 2
+    assert [r.remaining for r in results[:4]] == [9, 8, 7, 6]
+    assert results[9].remaining == 0
+    # Leases of 4 and 4 reach the 80% ceiling; every later hit is one round trip.
+    assert redis.round_trips == 6
+
+    other = RedisRateLimiter(redis, lease_percent=40)
+    assert (await other.allow_many([("key", rule)]))[0].allowed is False
+
+
+@pytest.mark.asyncio
+async def test_redis_rate_limiter_unused_leases_stop_at_the_ceiling():
+    redis = _FakeRedis()
+    rule = RateLimitRule(limit=10, window_seconds=60)
+
+    # Each request lands on a fresh instance whose lease then goes unused.
+    results = [await RedisRateLimiter(redis, lease_percent=50).allow("key", rule) for _ in range(7)]
+
+    assert [r.allowed for r in results] == [True] * 6 + [False]
+    assert list(redis.counts.values()) == [11]
+
+
+def test_sharded_cache_splits_large_capacities_only():
+    assert len(_ShardedCache(10)._shards) == 1
+    assert len(_ShardedCache(10000)._shards) == 64
+
+    cache: _ShardedCache[int] = _ShardedCache(10000)
+    for index in range(20000):
+        cache.set(f"ip:{index}", index)
+    assert len(cache) <= 10000
+    assert cache.get("ip:19999", -1) == 19999
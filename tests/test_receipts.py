@@ -3,8 +3,14 @@ from __future__ import annotations
 from datetime import datetime, timezone
 
 import pytest
+from _payloads import BASE_PAYLOAD
+from sqlalchemy import event
 
-from receiptgate.ledger_v1 import ReceiptConflictError, put_receipt
+from receiptgate import ledger_v1
+from receiptgate.ledger_v1 import ReceiptConflictError, _receipt_cache, put_receipt
+
+# No test asserts on wall-clock time, so receipts default to a fixed timestamp.
+_DEFAULT_NOW = datetime(2026, 1, 1, tzinfo=timezone.utc).isoformat()
 
 
 def _receipt_payload(
@@ -13,48 +19,28 @@ def _receipt_payload(
     task_id: str,
     recipient_ai: str,
     created_at: str | None = None,
-    task_summary: str = "Test task",
 ):
-    now = created_at or datetime.now(timezone.utc).isoformat()
+    now = created_at or _DEFAULT_NOW
     return {
-        "schema_version": "1.0",
-        "receipt_id": receipt_id,
-        "task_id": task_id,
-        "parent_task_id": "NA",
+        **BASE_PAYLOAD,
         "caused_by_receipt_id": "NA",
-        "dedupe_key": "NA",
-        "attempt": 0,
-        "from_principal": "principal:p",
-        "for_principal": "principal:p",
-        "source_system": "receiptgate-test",
-        "recipient_ai": recipient_ai,
-        "trust_domain": "test",
         "phase": "accepted",
         "status": "NA",
-        "realtime": False,
-        "task_type": "test.task",
-        "task_summary": task_summary,
+        "task_summary": "Test task",
         "task_body": "Testing receipt storage",
-        "inputs": {"test": "data"},
-        "expected_outcome_kind": "response_text",
-        "expected_artifact_mime": "NA",
         "outcome_kind": "NA",
         "outcome_text": "NA",
-        "artifact_location": "NA",
-        "artifact_pointer": "NA",
-        "artifact_checksum": "NA",
-        "artifact_size_bytes": 0,
-        "artifact_mime": "NA",
         "escalation_class": "NA",
         "escalation_reason": "NA",
         "escalation_to": "NA",
-        "retry_requested": False,
-        "created_at": now,
         "stored_at": None,
         "started_at": None,
         "completed_at": None,
-        "read_at": None,
-        "archived_at": None,
+        "receipt_id": receipt_id,
+        "task_id": task_id,
+        "recipient_ai": recipient_ai,
+        "inputs": {"test": "data"},
+        "created_at": now,
         "metadata": {},
     }
 
@@ -72,12 +58,7 @@ def test_put_receipt_collision_raises(db_session):
     payload = _receipt_payload(receipt_id="r-collision", task_id="task-2", recipient_ai="agent:a")
     put_receipt(db_session, payload, "tenant-a")
 
-    mutated = _receipt_payload(
-        receipt_id="r-collision",
-        task_id="task-2",
-        recipient_ai="agent:a",
-        task_summary="Different summary",
-    )
+    mutated = dict(payload, task_summary="Different summary")
     with pytest.raises(ReceiptConflictError):
         put_receipt(db_session, mutated, "tenant-a")
 
@@ -106,11 +87,43 @@ def test_put_receipt_allows_same_id_different_tenant(db_session):
     result_a = put_receipt(db_session, payload, "tenant-a")
     assert result_a["idempotent_replay"] is False
 
-    mutated = _receipt_payload(
-        receipt_id="r-shared",
-        task_id="task-7",
-        recipient_ai="agent:a",
-        task_summary="Different summary",
-    )
+    mutated = dict(payload, task_summary="Different summary")
     result_b = put_receipt(db_session, mutated, "tenant-b")
     assert result_b["idempotent_replay"] is False
+
+
+def test_put_receipt_inserts_new_receipt_in_one_statement(db_session):
+    statements = []
+    engine = db_session.get_bind()
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement.split()[0].upper())
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        payload = _receipt_payload(receipt_id="r-single", task_id="task-8", recipient_ai="agent:a")
+        put_receipt(db_session, payload, "tenant-a")
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    assert statements == ["INSERT"]
+
+    _receipt_cache.clear()
+    assert put_receipt(db_session, payload, "tenant-a")["idempotent_replay"] is True
+    with pytest.raises(ReceiptConflictError):
+        put_receipt(db_session, dict(payload, task_summary="Changed"), "tenant-a")
+
+
+def test_put_receipt_replay_reuses_stored_hash(db_session, monkeypatch):
+    payload = _receipt_payload(receipt_id="r-hashed", task_id="task-9", recipient_ai="agent:a")
+    put_receipt(db_session, payload, "tenant-a")
+
+    hashed = []
+    original = ledger_v1._canonical_receipt_hash
+
+    def counting_hash(receipt):
+        hashed.append(receipt["receipt_id"])
+        return original(receipt)
+
+    monkeypatch.setattr(ledger_v1, "_canonical_receipt_hash", counting_hash)
+    assert put_receipt(db_session, payload, "tenant-a")["idempotent_replay"] is True
+    assert hashed == ["r-hashed"]
@@ -1,7 +1,8 @@
 from __future__ import annotations
 
-import json
+from dataclasses import replace
 
+import orjson
 import pytest
 
 from receiptgate.security_middleware import (
@@ -32,9 +33,9 @@ def test_load_request_size_limit_config_from_env(monkeypatch):
     assert config.max_body_bytes == 123
 
 
-@pytest.mark.asyncio
-async def test_security_headers_middleware_injects_headers():
-    config = SecurityHeadersConfig(
+@pytest.fixture(scope="session")
+def headers_config():
+    return SecurityHeadersConfig(
         enabled=True,
         enable_hsts=True,
         hsts_max_age=60,
@@ -46,6 +47,14 @@ async def test_security_headers_middleware_injects_headers():
         content_security_policy=None,
     )
 
+
+@pytest.fixture(scope="session")
+def size_limit_config():
+    return RequestSizeLimitConfig(enabled=True, max_body_bytes=4)
+
+
+@pytest.mark.asyncio
+async def test_security_headers_middleware_injects_headers(headers_config):
     messages = []
 
     async def app(scope, receive, send):
@@ -56,7 +65,7 @@ async def test_security_headers_middleware_injects_headers():
         })
         await send({"type": "http.response.body", "body": b"{}"})
 
-    middleware = SecurityHeadersMiddleware(app, config)
+    middleware = SecurityHeadersMiddleware(app, headers_config)
     scope = {"type": "http", "method": "GET"}
 
     async def receive():
@@ -67,21 +76,43 @@ async def test_security_headers_middleware_injects_headers():
 
     await middleware(scope, receive, send)
 
-    headers = dict(messages[0]["headers"])
-    assert b"x-content-type-options" in {k.lower() for k in headers.keys()}
-    assert b"strict-transport-security" in {k.lower() for k in headers.keys()}
+    present = {k.lower() for k, _ in messages[0]["headers"]}
+    assert b"x-content-type-options" in present
+    assert b"strict-transport-security" in present
 
 
 @pytest.mark.asyncio
-async def test_request_size_limit_rejects_large_body():
-    config = RequestSizeLimitConfig(enabled=True, max_body_bytes=4)
+async def test_security_headers_middleware_keeps_app_headers(headers_config):
+    config = replace(headers_config, enable_hsts=False, permissions_policy="")
+    messages = []
+
+    async def app(scope, receive, send):
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [(b"X-Frame-Options", b"SAMEORIGIN")],
+        })
+
+    async def send(message):
+        messages.append(message)
 
+    await SecurityHeadersMiddleware(app, config)({"type": "http"}, None, send)
+
+    assert messages[0]["headers"] == [
+        (b"X-Frame-Options", b"SAMEORIGIN"),
+        (b"x-content-type-options", b"nosniff"),
+        (b"referrer-policy", b"no-referrer"),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_request_size_limit_rejects_large_body(size_limit_config):
     async def app(scope, receive, send):
         await receive()
         await send({"type": "http.response.start", "status": 200, "headers": []})
         await send({"type": "http.response.body", "body": b"ok"})
 
-    middleware = RequestSizeLimitMiddleware(app, config)
+    middleware = RequestSizeLimitMiddleware(app, size_limit_config)
 
     messages = []
 
@@ -96,5 +127,41 @@ async def test_request_size_limit_rejects_large_body():
     await middleware(scope, receive, send)
 
     assert messages[0]["status"] == 413
-    payload = json.loads(messages[1]["body"].decode())
+    payload = orjson.loads(messages[1]["body"])
     assert payload["error"] == "request_too_large"
+
+
+@pytest.mark.asyncio
+async def test_request_size_limit_passes_receive_through_for_declared_length(size_limit_config):
+    seen = []
+
+    async def app(scope, receive, send):
+        seen.append(receive)
+
+    async def receive():
+        return {"type": "http.request", "body": b"12"}
+
+    middleware = RequestSizeLimitMiddleware(app, size_limit_config)
+    declared = {"type": "http", "method": "POST", "headers": [(b"content-length", b"2")]}
+    await middleware(declared, receive, None)
+    await middleware({"type": "http", "method": "POST", "headers": []}, receive, None)
+
+    assert seen[0] is receive
+    assert seen[1] is not receive
+
+
+@pytest.mark.asyncio
+async def test_request_size_limit_rejects_declared_length_before_reading(size_limit_config):
+    messages = []
+
+    async def app(scope, receive, send):
+        raise AssertionError("oversized request reached the app")
+
+    async def send(message):
+        messages.append(message)
+
+    middleware = RequestSizeLimitMiddleware(app, size_limit_config)
+    headers = [(b"host", b"example"), (b"Content-Length", b"5")]
+    await middleware({"type": "http", "method": "POST", "headers": headers}, None, send)
+
+    assert messages[0]["status"] == 413
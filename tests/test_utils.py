@@ -1,46 +1,53 @@
 from __future__ import annotations
 
-from receiptgate.utils import canonical_hash
+from datetime import datetime, timedelta, timezone
 
+import pytest
 
-def test_canonical_hash_omits_created_at_when_disabled():
-    payload = {
-        "receipt_id": "r-1",
-        "task_id": "task-1",
-        "created_at": "2026-02-01T00:00:00Z",
-        "value": {"b": 1, "a": 2},
-    }
-    _, digest_a = canonical_hash(payload, include_created_at=False)
+from receiptgate.utils import canonical_hash, json_size_bytes, normalize_datetime
 
-    mutated = dict(payload)
-    mutated["created_at"] = "2026-02-02T00:00:00Z"
-    _, digest_b = canonical_hash(mutated, include_created_at=False)
+_PAYLOAD = {
+    "receipt_id": "r-1",
+    "task_id": "task-1",
+    "created_at": "2026-02-01T00:00:00Z",
+    "value": {"b": 1, "a": 2},
+}
+_RECREATED = dict(_PAYLOAD, created_at="2026-02-02T00:00:00Z")
 
-    assert digest_a == digest_b
 
+@pytest.mark.parametrize(
+    ("payload", "other", "include_created_at", "expect_equal"),
+    [
+        (_PAYLOAD, _RECREATED, False, True),
+        (_PAYLOAD, _RECREATED, True, False),
+        ({"a": 1, "b": {"x": 2, "y": 3}}, {"b": {"y": 3, "x": 2}, "a": 1}, True, True),
+    ],
+    ids=["omits_created_at_when_disabled", "includes_created_at_when_enabled", "order_invariant"],
+)
+def test_canonical_hash_equality(payload, other, include_created_at, expect_equal):
+    canonical_a, digest_a = canonical_hash(payload, include_created_at=include_created_at)
+    canonical_b, digest_b = canonical_hash(other, include_created_at=include_created_at)
 
-def test_canonical_hash_includes_created_at_when_enabled():
-    payload = {
-        "receipt_id": "r-2",
-        "task_id": "task-2",
-        "created_at": "2026-02-01T00:00:00Z",
-        "value": {"b": 1, "a": 2},
-    }
-    _, digest_a = canonical_hash(payload, include_created_at=True)
+    assert (canonical_a == canonical_b) is expect_equal
+    assert (digest_a == digest_b) is expect_equal
 
-    mutated = dict(payload)
-    mutated["created_at"] = "2026-02-02T00:00:00Z"
-    _, digest_b = canonical_hash(mutated, include_created_at=True)
 
-    assert digest_a != digest_b
+def test_canonical_hash_leaves_payload_untouched():
+    payload = {"receipt_id": "r-1", "created_at": "2026-01-01T00:00:00Z", "inputs": {"b": 1}}
+    canonical, _ = canonical_hash(payload, include_created_at=False)
+    assert canonical == '{"inputs":{"b":1},"receipt_id":"r-1"}'
+    assert payload["created_at"] == "2026-01-01T00:00:00Z"
 
 
-def test_canonical_hash_is_order_invariant():
-    payload_a = {"a": 1, "b": {"x": 2, "y": 3}}
-    payload_b = {"b": {"y": 3, "x": 2}, "a": 1}
+def test_json_size_bytes_counts_escaped_output():
+    assert json_size_bytes({"k": "\u00e9"}) == len('{"k":"\\u00e9"}')
 
-    canonical_a, digest_a = canonical_hash(payload_a, include_created_at=True)
-    canonical_b, digest_b = canonical_hash(payload_b, include_created_at=True)
 
-    assert canonical_a == canonical_b
-    assert digest_a == digest_b
+def test_normalize_datetime_returns_utc_values_unchanged():
+    stamp = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    assert normalize_datetime(stamp) is stamp
+
+    offset = datetime(2026, 1, 1, 2, tzinfo=timezone(timedelta(hours=2)))
+    assert normalize_datetime(offset) == stamp
+    assert normalize_datetime(offset).tzinfo is timezone.utc
+    assert normalize_datetime(datetime(2026, 1, 1)) == stamp
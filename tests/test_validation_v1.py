@@ -2,12 +2,24 @@ from __future__ import annotations
 
 from datetime import datetime, timezone
 
+import pytest
+from _payloads import BASE_PAYLOAD
+
 from receiptgate.validation_v1 import (
+    _schema_validator,
+    apply_server_fields,
+    apply_server_fields_inplace,
     is_terminal_receipt,
+    preload_schema,
+    reload_schema,
+    validate_field_sizes,
     validate_receipt_payload,
     validate_routing_invariant,
 )
 
+# No test asserts on wall-clock time, so receipts default to a fixed timestamp.
+_DEFAULT_NOW = datetime(2026, 1, 1, tzinfo=timezone.utc).isoformat()
+
 
 def _base_payload(
     *,
@@ -23,41 +35,25 @@ def _base_payload(
     escalation_to: str = "NA",
     completed_at: str | None = None,
 ):
-    now = datetime.now(timezone.utc).isoformat()
+    now = _DEFAULT_NOW
     return {
-        "schema_version": "1.0",
+        **BASE_PAYLOAD,
         "tenant_id": "tenant-a",
+        "caused_by_receipt_id": "NA",
+        "task_summary": "Test task",
+        "task_body": "Testing receipt validation",
+        "started_at": None,
         "receipt_id": receipt_id,
         "task_id": task_id,
-        "parent_task_id": "NA",
-        "caused_by_receipt_id": "NA",
-        "dedupe_key": "NA",
-        "attempt": 0,
-        "from_principal": "principal:p",
-        "for_principal": "principal:p",
-        "source_system": "receiptgate-test",
         "recipient_ai": recipient_ai,
-        "trust_domain": "test",
         "phase": phase,
         "status": status,
-        "realtime": False,
-        "task_type": "test.task",
-        "task_summary": "Test task",
-        "task_body": "Testing receipt validation",
         "inputs": {"test": "data"},
-        "expected_outcome_kind": "response_text",
-        "expected_artifact_mime": "NA",
         "outcome_kind": outcome_kind,
         "outcome_text": outcome_text,
-        "artifact_location": "NA",
-        "artifact_pointer": "NA",
-        "artifact_checksum": "NA",
-        "artifact_size_bytes": 0,
-        "artifact_mime": "NA",
         "escalation_class": escalation_class,
         "escalation_reason": escalation_reason,
         "escalation_to": escalation_to,
-        "retry_requested": False,
         "body": {
             "summary": "Test receipt",
             "phase": phase,
@@ -65,10 +61,7 @@ def _base_payload(
         "artifact_refs": [],
         "created_at": now,
         "stored_at": now,
-        "started_at": None,
         "completed_at": completed_at,
-        "read_at": None,
-        "archived_at": None,
         "metadata": {},
     }
 
@@ -125,7 +118,54 @@ def test_validate_receipt_payload_escalate_valid():
     assert errors == []
 
 
-def test_terminal_receipt_detection():
-    assert is_terminal_receipt({"phase": "accepted"}) is False
-    assert is_terminal_receipt({"phase": "complete"}) is True
-    assert is_terminal_receipt({"phase": "escalate"}) is True
+@pytest.mark.parametrize(
+    ("phase", "expected"),
+    [("accepted", False), ("complete", True), ("escalate", True)],
+    ids=["accepted", "complete", "escalate"],
+)
+def test_terminal_receipt_detection(phase, expected):
+    assert is_terminal_receipt({"phase": phase}) is expected
+
+
+def test_schema_validator_is_compiled_once():
+    validator = _schema_validator()
+    assert _schema_validator() is validator
+
+    reload_schema()
+    preload_schema()
+    assert _schema_validator.cache_info().currsize == 1
+    assert _schema_validator() is not validator
+
+    errors = validate_receipt_payload({"receipt_id": "r-1"})
+    assert errors[0]["constraint"] == "json_schema"
+
+
+def test_validate_field_sizes_measures_stored_json():
+    # {"k":"é…"}: 8 bytes of structure plus 2 bytes per é, exactly the 16 KiB limit.
+    metadata = {"k": "\u00e9" * (8 * 1024 - 4)}
+    assert validate_field_sizes({"metadata": metadata}) == []
+
+    errors = validate_field_sizes({"metadata": dict(metadata, k2=1)})
+    assert errors[0]["field"] == "metadata"
+
+
+def test_validate_field_sizes_bounds_strings_without_encoding(monkeypatch):
+    def fail(value):
+        raise AssertionError("short strings need no encoding")
+
+    monkeypatch.setattr("receiptgate.validation_v1._json_size_bytes", fail)
+    assert validate_field_sizes({"task_body": "\x00" * (100 * 1024 // 6)}) == []
+
+    monkeypatch.undo()
+    errors = validate_field_sizes({"task_body": "\x00" * (100 * 1024 // 6 + 1)})
+    assert errors[0]["constraint"] == f"max_size_{100 * 1024}"
+
+
+def test_apply_server_fields_copies_unless_inplace():
+    payload = {"receipt_id": "r-1", "tenant_id": "spoofed"}
+    updated = apply_server_fields(payload, tenant_id="tenant-a", stored_at="now")
+    assert updated == {"receipt_id": "r-1", "tenant_id": "tenant-a", "stored_at": "now"}
+    assert payload["tenant_id"] == "spoofed"
+
+    assert apply_server_fields_inplace(payload, tenant_id="tenant-a", stored_at="now") is payload
+    assert payload == updated